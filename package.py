@@ -17,6 +17,7 @@ requires = [
     "os",
     "cv2",
     "moviepy",
+    "numpy",
     "datetime",
 ]
 
@@ -0,0 +1,111 @@
+import logging
+import os
+import queue
+import tempfile
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Per frame messages, only shown and written when verbose logging is turned on.
+VERBOSE = 15
+logging.addLevelName(VERBOSE, "VERBOSE")
+
+
+class SignalHandler(logging.Handler):
+    """Forwards the formatted records to a Qt signal, which queues them to the GUI thread."""
+
+    def __init__(self, signal):
+        """
+        Initialize the SignalHandler.
+
+        Args:
+            signal (pyqtBoundSignal): The signal emitted with each formatted record.
+        """
+        super().__init__()
+        self.signal = signal
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.signal.emit(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class ConsoleLogger(QObject):
+    """
+    Queues the console messages as log records, so any thread can log without touching the GUI.
+
+    A background listener hands the records to the console in the GUI thread and writes them to a rotating
+    log file. The level is checked before a message is formatted, so filtered messages cost almost nothing.
+    """
+
+    recordReady = pyqtSignal(str)
+
+    def __init__(self, log_file: str = None, max_bytes: int = 5 * 1024 ** 2, backup_count: int = 3, parent=None):
+        """
+        Initialize the ConsoleLogger.
+
+        Args:
+            log_file (str, optional): The path of the log file. Defaults to a file in the system temp directory.
+            max_bytes (int): The size at which the log file is rotated. Defaults to 5MB.
+            backup_count (int): The number of rotated log files to keep.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+
+        self.logger = logging.getLogger("SuperSprite.{}".format(id(self)))
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+        self.queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(self.queue))
+
+        console_handler = SignalHandler(self.recordReady)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers = [console_handler]
+
+        self.log_file = log_file or "{}/{}/{}".format(tempfile.gettempdir(), "SuperSprite_Logs", "super_sprite.log")
+        try:
+            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+            file_handler = RotatingFileHandler(self.log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding="utf-8", delay=True)
+            file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+            handlers.append(file_handler)
+        except OSError:
+            # Without a writable log directory the messages are only shown in the console.
+            self.log_file = None
+
+        self.handlers = handlers
+        self.listener = QueueListener(self.queue, *handlers)
+        self.listener.start()
+
+    def log(self, level: int, message: str, *args) -> None:
+        """
+        Queues a message if its level is enabled, the arguments are only formatted into it when it is.
+
+        Args:
+            level (int): The logging level of the message.
+            message (str): The message, with %-style placeholders for the arguments.
+            *args: The values of the placeholders.
+        """
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args)
+
+    def set_verbose(self, verbose: bool) -> None:
+        """
+        Shows or hides the per frame messages.
+
+        Args:
+            verbose (bool): Log the VERBOSE messages.
+        """
+        self.logger.setLevel(VERBOSE if verbose else logging.INFO)
+
+    def stop(self) -> None:
+        """
+        Writes the queued messages and stops the listener.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            for handler in self.handlers:
+                handler.close()
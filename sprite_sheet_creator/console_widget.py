@@ -1,17 +1,108 @@
-from PyQt5.QtGui import QTextCursor, QColor, QTextOption
-from PyQt5.QtWidgets import QWidget, QTextEdit, QVBoxLayout, QScrollArea
+import logging
+import re
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QColor, QTextOption, QSyntaxHighlighter, QTextCharFormat
+from PyQt5.QtWidgets import QWidget, QPlainTextEdit, QVBoxLayout, QScrollArea
 
 import style_sheet
+from console_logger import ConsoleLogger, VERBOSE
+
+
+class ConsoleHighlighter(QSyntaxHighlighter):
+    """
+    Colors the keywords of the console messages.
+
+    Qt only highlights the blocks whose text changed, so appending a message colors that message alone
+    instead of searching the whole console again.
+    """
+
+    # Define color formats for specific words, later words override the colors of earlier ones they contain.
+    color_formats = {
+        'ERROR': QColor('red'),
+        'WARNING': QColor('orange'),
+        'INFO': QColor('cyan'),
+        'STDOUT': QColor('lightgreen'),
+        'PYTHON': QColor('mediumpurple'),
+        'SyntaxError': QColor('red'),
+        'NameError': QColor('red'),
+        'TypeError': QColor('red'),
+        'IndexError': QColor('red'),
+        'ValueError': QColor('red'),
+        'KeyError': QColor('red'),
+        'AttributeError': QColor('red'),
+        'ImportError': QColor('red'),
+        'FileNotFoundError': QColor('red'),
+        'ZeroDivisionError': QColor('red'),
+        'IOError': QColor('red'),
+        'AssertionError': QColor('red'),
+        'KeyboardInterrupt': QColor('red'),
+        'MemoryError': QColor('red'),
+        'OverflowError': QColor('red'),
+        'RecursionError': QColor('red'),
+        'NotImplementedError': QColor('red'),
+        'IndentationError': QColor('red'),
+        'DeprecationWarning': QColor('red'),
+        'BaseException': QColor('red'),
+        'Exception': QColor('red'),
+        'ArithmeticError': QColor('red'),
+        'StopIteration': QColor('red'),
+        'OSError': QColor('red'),
+        'RuntimeError': QColor('red'),
+        'SystemExit': QColor('red'),
+        'ValueWarning': QColor('orange'),
+        'PermissionError': QColor('purple'),
+        'SyntaxWarning': QColor('yellow'),
+        'RuntimeWarning': QColor('pink'),
+        'UserWarning': QColor('green'),
+        'PendingDeprecationWarning': QColor('brown'),
+    }
+
+    def __init__(self, document):
+        """
+        Initialize the ConsoleHighlighter.
+
+        Args:
+            document (QTextDocument): The console document.
+        """
+        super().__init__(document)
+
+        # The words are matched anywhere and regardless of case, like the document search the console used.
+        self.rules = []
+        for word, color in self.color_formats.items():
+            text_format = QTextCharFormat()
+            text_format.setForeground(color)
+            self.rules.append((re.compile(re.escape(word), re.IGNORECASE), text_format))
+
+    def highlightBlock(self, text: str) -> None:
+        for pattern, text_format in self.rules:
+            for match in pattern.finditer(text):
+                self.setFormat(match.start(), match.end() - match.start(), text_format)
 
 
 class ConsoleWidget(QWidget):
     """
     Display's information and errors to the user.
+
+    Messages go through a ConsoleLogger, so they can be appended from any thread and are also written to a
+    rotating log file. They are collected and appended once per event loop iteration, and only the newest
+    lines are kept, so logging a message per frame stays cheap for long sequences.
     """
 
-    def __init__(self):
+    # The level of a message is read from its prefix, messages without one are logged as INFO.
+    message_levels = {
+        "ERROR": logging.ERROR,
+        "WARNING": logging.WARNING,
+        "INFO": logging.INFO,
+    }
+
+    def __init__(self, max_lines: int = 5000, log_file: str = None):
         """
         Initialize the ConsoleWidget.
+
+        Args:
+            max_lines (int): The number of lines kept in the console, older lines are dropped.
+            log_file (str, optional): The path of the rotating log file. Defaults to a file in the temp directory.
         """
         super().__init__()
         layout = QVBoxLayout()
@@ -22,15 +113,28 @@ class ConsoleWidget(QWidget):
         # Allow the widget to be resizable
         scroll_area.setWidgetResizable(True)
 
-        # Create the QTextEdit widget for the console window
-        self.console = QTextEdit()
+        # Create the QPlainTextEdit widget for the console window
+        self.console = QPlainTextEdit()
         self.console.setStyleSheet(style_sheet.console_style())
         self.console.setReadOnly(True)  # Set the console window to read-only
+        self.console.setMaximumBlockCount(max_lines)
 
-        # Disable word wrap in the QTextEdit widget
+        # Disable word wrap in the QPlainTextEdit widget
         self.console.setWordWrapMode(QTextOption.NoWrap)
 
-        # Set the QTextEdit widget as the scroll area's widget
+        self.highlighter = ConsoleHighlighter(self.console.document())
+
+        # The messages waiting for the next flush.
+        self.pending_lines = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
+
+        self.logger = ConsoleLogger(log_file, parent=self)
+        self.logger.recordReady.connect(self.append_line)
+
+        # Set the QPlainTextEdit widget as the scroll area's widget
         scroll_area.setWidget(self.console)
 
         layout.addWidget(scroll_area)
@@ -40,67 +144,69 @@ class ConsoleWidget(QWidget):
         """
         Append text to the console window.
 
+        Safe to call from any thread, the text is queued and shown with the next batch of messages.
+
         Args:
             text (str): The text to be appended to the console window.
 
         Returns:
             None
         """
-        # Append text to the console window
-        self.console.append(text)
-        self.console.moveCursor(QTextCursor.End)  # Move cursor to the end
-
-        # Define color formats for specific words
-        color_formats = {
-            'ERROR': QColor('red'),
-            'WARNING': QColor('orange'),
-            'INFO': QColor('cyan'),
-            'STDOUT': QColor('lightgreen'),
-            'PYTHON': QColor('mediumpurple'),
-            'SyntaxError': QColor('red'),
-            'NameError': QColor('red'),
-            'TypeError': QColor('red'),
-            'IndexError': QColor('red'),
-            'ValueError': QColor('red'),
-            'KeyError': QColor('red'),
-            'AttributeError': QColor('red'),
-            'ImportError': QColor('red'),
-            'FileNotFoundError': QColor('red'),
-            'ZeroDivisionError': QColor('red'),
-            'IOError': QColor('red'),
-            'AssertionError': QColor('red'),
-            'KeyboardInterrupt': QColor('red'),
-            'MemoryError': QColor('red'),
-            'OverflowError': QColor('red'),
-            'RecursionError': QColor('red'),
-            'NotImplementedError': QColor('red'),
-            'IndentationError': QColor('red'),
-            'DeprecationWarning': QColor('red'),
-            'BaseException': QColor('red'),
-            'Exception': QColor('red'),
-            'ArithmeticError': QColor('red'),
-            'StopIteration': QColor('red'),
-            'OSError': QColor('red'),
-            'RuntimeError': QColor('red'),
-            'SystemExit': QColor('red'),
-            'ValueWarning': QColor('orange'),
-            'PermissionError': QColor('purple'),
-            'SyntaxWarning': QColor('yellow'),
-            'RuntimeWarning': QColor('pink'),
-            'UserWarning': QColor('green'),
-            'PendingDeprecationWarning': QColor('brown'),
-        }
-
-        for word, color in color_formats.items():
-            format_start = self.console.document().find(word)
-            while not format_start.isNull():
-                format_end = QTextCursor(format_start)
-                format_end.movePosition(QTextCursor.EndOfWord)
-                format_text = format_start.charFormat()
-                format_text.setForeground(color)
-                format_start.mergeCharFormat(format_text)
-                format_start = self.console.document().find(word, format_end)
-
-        # Move the cursor to the end after formatting
-        self.console.moveCursor(QTextCursor.End)
+        text = str(text)
+        prefix = text.split(":", 1)[0].strip().upper()
+        self.logger.log(self.message_levels.get(prefix, logging.INFO), text)
+
+    def append_verbose(self, text: str, *args) -> None:
+        """
+        Append a per frame message to the console window, if verbose messages are turned on.
 
+        The arguments are only formatted into the text when the message is shown, so hidden messages are cheap.
+
+        Args:
+            text (str): The text, with %-style placeholders for the arguments.
+            *args: The values of the placeholders.
+        """
+        self.logger.log(VERBOSE, text, *args)
+
+    def set_verbose(self, verbose: bool) -> None:
+        """
+        Shows or hides the per frame messages.
+
+        Args:
+            verbose (bool): Show the verbose messages.
+        """
+        self.logger.set_verbose(verbose)
+
+    def append_line(self, text: str) -> None:
+        """
+        Queues a formatted message for the next flush. Runs on the GUI thread.
+
+        Args:
+            text (str): The message.
+        """
+        self.pending_lines.append(text)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self) -> None:
+        """
+        Appends the waiting messages to the console window in one edit.
+        """
+        if not self.pending_lines:
+            return
+
+        # Only the newest lines fit in the console, the rest would be dropped right away.
+        lines = self.pending_lines[-self.console.maximumBlockCount():]
+        self.pending_lines = []
+
+        self.console.appendPlainText("\n".join(lines))
+
+        # Move the cursor to the end after appending
+        scroll_bar = self.console.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    def close_log(self) -> None:
+        """
+        Writes the queued messages to the log file and closes it.
+        """
+        self.logger.stop()
@@ -0,0 +1,113 @@
+import os
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+    A table model with one row per file of the image sequence.
+
+    Files are appended in bulk as paths. The file name and path columns come straight from the path, the other
+    columns need the file metadata, which is only looked up when the view asks for a row, so the rows that
+    never scroll into view cost nothing but their path.
+    """
+
+    HEADER_LABELS = ["Created At:", "File Name:", "File Path:", "File Size:", "Width", "Height", "Bit Depth"]
+
+    def __init__(self, metadata_provider=None, parent=None):
+        """
+        Initialize the FileTableModel.
+
+        Args:
+            metadata_provider (callable, optional): Called with a file path, returns its metadata dict.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.metadata_provider = metadata_provider
+
+        # Each row holds the file path and its column values, None until the row is first shown.
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.HEADER_LABELS)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADER_LABELS[section]
+        return str(section + 1)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        if index.column() == 1 and row[1] is None:
+            return os.path.basename(row[0])
+        if index.column() == 2 and row[1] is None:
+            return row[0]
+        return self.get_values(row)[index.column()]
+
+    def get_values(self, row: list) -> list:
+        """
+        Gets the column values of a row, looking up the file metadata the first time the row is shown.
+
+        Args:
+            row (list): The file path and the cached column values of the row.
+
+        Returns:
+            list: The column values as strings.
+        """
+        if row[1] is None:
+            metadata = self.metadata_provider(row[0])
+
+            # Extract file size
+            file_size_gb = metadata["file_size"] / (1024 * 1024)
+            formatted_file_size_gb = "{:.3f}GB".format(file_size_gb)
+
+            row[1] = [str(value) for value in (
+                metadata["creation_time"], metadata["file_name"], metadata["file_path"], formatted_file_size_gb,
+                metadata["width"], metadata["height"], "{}bit".format(metadata["depth"]))]
+        return row[1]
+
+    def append_files(self, file_paths: list) -> None:
+        """
+        Appends a row per file in a single insert.
+
+        Args:
+            file_paths (list): The paths of the files.
+        """
+        if not file_paths:
+            return
+        first_row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(file_paths) - 1)
+        self.rows.extend([file_path, None] for file_path in file_paths)
+        self.endInsertRows()
+
+    def append_values(self, values: list) -> None:
+        """
+        Appends a row with known column values.
+
+        Args:
+            values (list): A value per column.
+        """
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append([str(values[2]), [str(value) for value in values]])
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """
+        Removes all the rows.
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+
+
+class FrameCache:
+    """
+    An in-memory least recently used cache with a byte budget.
+
+    Once the cached entries use more than the budget, the least recently used entries are evicted.
+    The cache can be shared between the GUI thread and worker threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the FrameCache.
+
+        Args:
+            max_bytes (int): The number of bytes the cached entries may use.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Gets a cached entry and marks it as the most recently used.
+
+        Args:
+            key: The key of the entry.
+
+        Returns:
+            The cached value, or None if the key is not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size: int) -> None:
+        """
+        Adds an entry to the cache and evicts the least recently used entries to stay within the budget.
+
+        Args:
+            key: The key of the entry.
+            value: The value to cache.
+            size (int): The number of bytes the value uses.
+        """
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+
+            # Values larger than the whole budget are not worth keeping.
+            if size > self.max_bytes:
+                return
+
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            self.evict()
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """
+        Changes the byte budget of the cache.
+
+        Args:
+            max_bytes (int): The number of bytes the cached entries may use.
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits in its budget.
+        The lock must be held by the caller.
+        """
+        while self.current_bytes > self.max_bytes and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.current_bytes -= size
+
+    def clear(self) -> None:
+        """
+        Removes all the entries from the cache.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key) -> bool:
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
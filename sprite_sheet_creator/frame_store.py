@@ -0,0 +1,396 @@
+import os
+import threading
+from concurrent.futures import Future
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from frame_cache import FrameCache
+from metadata_probe import MetadataProbe
+from thumbnail_disk_cache import ThumbnailDiskCache
+from video_source import VideoSource
+
+
+class Frame:
+    """
+    The metadata of a single frame of the image sequence.
+
+    The thumbnails are not kept per frame, they only live in the bounded pixmap cache of the thumbnail strip
+    and in the thumbnail disk cache.
+    """
+
+    def __init__(self, file_path: str, key: tuple, metadata: dict):
+        """
+        Initialize the Frame.
+
+        Args:
+            file_path (str): The path of the image file.
+            key (tuple): The path, modification time and size of the file when it was decoded.
+            metadata (dict): The file and image information.
+        """
+        self.file_path = file_path
+        self.key = key
+        self.metadata = metadata
+
+
+class FrameStore:
+    """
+    Decodes the frames of the image sequence on demand and shares the result with all the widgets.
+
+    QImage is implicitly shared, so handing the same image to several widgets does not copy the pixels.
+    The returned images are meant to be read only, painting on one detaches it from the store.
+
+    Frames are decoded on the worker threads of the widgets asking for them, Qt releases the GIL while it
+    decodes an image file.
+
+    The full resolution images are kept in a least recently used cache with a byte budget. The cache is keyed
+    by path, modification time and file size, so a frame that changed on disk is decoded again.
+
+    The metadata is read from the file headers only, so it is available without decoding the frame. Setting a
+    sequence reads nothing, the pixels are decoded when a widget first asks for a frame.
+
+    Thumbnails are read from the thumbnail disk cache when the frame was seen before, so reopening a sequence
+    does not decode the full resolution frames again just to scale them down.
+
+    A frame requested from several threads at once, for example by the thumbnail strip and the playback
+    buffer, is decoded once and the other callers wait for that result.
+
+    The frames of a registered video source are decoded from the video container, addressed by their frame
+    paths, so a video is used without writing its frames to image files.
+    """
+
+    def __init__(self, main_console_widget, thumbnail_height: int = 150, cache_bytes: int = 2 * 1024 ** 3,
+                 thumbnail_cache: ThumbnailDiskCache = None):
+        """
+        Initialize the FrameStore.
+
+        Args:
+            main_console_widget (QWidget): The console widget for displaying messages.
+            thumbnail_height (int): The height of the preview images in pixels.
+            cache_bytes (int): The memory budget for the decoded full resolution images. Defaults to 2GB.
+            thumbnail_cache (ThumbnailDiskCache, optional): The persistent thumbnail cache. Defaults to a new
+                cache in the system temp directory.
+        """
+        self.console = main_console_widget
+        self.thumbnail_height = thumbnail_height
+
+        self.image_sequence = []
+        self.frames = {}
+        self.image_cache = FrameCache(cache_bytes)
+        self.metadata_probe = MetadataProbe()
+        self.thumbnail_cache = thumbnail_cache or ThumbnailDiskCache()
+
+        # The open videos the frames are decoded from, by video path, and the videos of the current sequence.
+        # A video that is no longer part of the sequence stays open while running jobs read its frames, the
+        # number of those jobs is counted by video path. Only changed on the GUI thread.
+        self.video_sources = {}
+        self.sequence_videos = set()
+        self.video_users = {}
+
+        # The frames being decoded right now, by path.
+        self.decoding = {}
+        self.decoding_lock = threading.Lock()
+        self.frames_lock = threading.Lock()
+
+        self.console.append_text("INFO: Frame Store Loaded.")
+
+    def set_sequence(self, image_sequence: list) -> None:
+        """
+        Replaces the image sequence, dropping the frames and videos it no longer uses. Runs on the GUI thread.
+
+        Nothing is decoded or read here, so the widgets can be filled as soon as the paths are known. The
+        frames are decoded when a widget first asks for them.
+
+        Args:
+            image_sequence (list): A list of image paths for the sequence.
+        """
+        try:
+            self.image_sequence = list(image_sequence)
+
+            # Drop the frames that are no longer part of the sequence.
+            sequence_paths = set(self.image_sequence)
+            with self.frames_lock:
+                removed_paths = [file_path for file_path in self.frames if file_path not in sequence_paths]
+                for file_path in removed_paths:
+                    del self.frames[file_path]
+            self.metadata_probe.discard(removed_paths)
+
+            # Release the videos that no frame of the sequence comes from, unless a running job still reads them.
+            self.sequence_videos = {VideoSource.split_frame_path(file_path)[0] for file_path in sequence_paths}
+            self.close_unused_videos()
+        except Exception as err:
+            self.console.append_text("ERROR: set_sequence: {}".format(err.args))
+
+    def add_video_source(self, video_source: VideoSource) -> None:
+        """
+        Registers a video, so its frames can be decoded by their frame paths. Runs on the GUI thread.
+
+        A video opened again replaces the previous source, readers looking its frames up afterwards get the
+        new one.
+
+        Args:
+            video_source (VideoSource): The opened video.
+        """
+        previous = self.video_sources.get(video_source.video_path)
+        self.video_sources[video_source.video_path] = video_source
+        if previous is not None:
+            previous.close()
+
+    def acquire_videos(self, image_sequence: list) -> list:
+        """
+        Keeps the videos of a sequence open for a job reading its frames, even if another sequence is loaded
+        meanwhile. Runs on the GUI thread, release_videos must be called once the job ended.
+
+        Args:
+            image_sequence (list): The paths of the frames the job reads.
+
+        Returns:
+            list: The paths of the videos that were acquired.
+        """
+        video_paths = {VideoSource.split_frame_path(file_path)[0] for file_path in image_sequence}
+        video_paths = [video_path for video_path in video_paths if video_path in self.video_sources]
+        for video_path in video_paths:
+            self.video_users[video_path] = self.video_users.get(video_path, 0) + 1
+        return video_paths
+
+    def release_videos(self, video_paths: list) -> None:
+        """
+        Releases the videos acquired for a job, closing the ones no longer used. Runs on the GUI thread.
+
+        Args:
+            video_paths (list): The paths returned by acquire_videos.
+        """
+        for video_path in video_paths:
+            users = self.video_users.get(video_path, 0) - 1
+            if users > 0:
+                self.video_users[video_path] = users
+            else:
+                self.video_users.pop(video_path, None)
+        self.close_unused_videos()
+
+    def close_unused_videos(self) -> None:
+        """
+        Closes the videos that are neither part of the sequence nor read by a running job.
+        """
+        unused = [video_path for video_path in self.video_sources
+                  if video_path not in self.sequence_videos and video_path not in self.video_users]
+        for video_path in unused:
+            self.video_sources.pop(video_path).close()
+
+    def get_video_frame(self, file_path: str) -> tuple:
+        """
+        Gets the video a frame is decoded from.
+
+        Args:
+            file_path (str): The path of the image file or the frame path.
+
+        Returns:
+            tuple: The VideoSource and the frame index, or None and None if the frame is an image file.
+        """
+        video_path, index = VideoSource.split_frame_path(file_path)
+        video_source = self.video_sources.get(video_path)
+        if video_source is None:
+            return None, None
+        return video_source, index
+
+    def is_video_frame(self, file_path: str) -> bool:
+        """
+        Checks if a frame is decoded from a video instead of an image file.
+
+        Args:
+            file_path (str): The path of the image file or the frame path.
+
+        Returns:
+            bool: True for the frames of a registered video.
+        """
+        return self.get_video_frame(file_path)[0] is not None
+
+    def get_file_key(self, file_path: str) -> tuple:
+        """
+        Gets the cache key of a file.
+
+        The frames of a video use the modification time and size of the video file.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            tuple: The path, modification time and size of the file.
+        """
+        video_source = self.get_video_frame(file_path)[0]
+        try:
+            stat = os.stat(video_source.video_path if video_source else file_path)
+            return file_path, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return file_path, 0, 0
+
+    def decode_image(self, file_path: str, key: tuple, cache: bool = True) -> QImage:
+        """
+        Decodes an image file and adds it to the image cache.
+
+        Args:
+            file_path (str): The path of the image file.
+            key (tuple): The cache key of the file.
+            cache (bool): If False the decoded image is not added to the image cache.
+
+        Returns:
+            QImage: The decoded image.
+        """
+        video_source, index = self.get_video_frame(file_path)
+        if video_source is not None:
+            image = video_source.read_frame(index)
+        else:
+            image = QImage(file_path)
+        # A frame that could not be decoded is tried again next time, for example once its video is reopened.
+        if cache and not image.isNull():
+            self.image_cache.put(key, image, image.sizeInBytes())
+        return image
+
+    def decode_shared(self, file_path: str, key: tuple, cache: bool = True) -> QImage:
+        """
+        Decodes an image file, or waits for the decode another thread already started.
+
+        Args:
+            file_path (str): The path of the image file.
+            key (tuple): The cache key of the file.
+            cache (bool): If False the decoded image is not added to the image cache.
+
+        Returns:
+            QImage: The decoded image.
+        """
+        with self.decoding_lock:
+            future = self.decoding.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.decoding[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            image = self.decode_image(file_path, key, cache)
+            future.set_result(image)
+            return image
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            with self.decoding_lock:
+                self.decoding.pop(key, None)
+
+    def get_frame(self, file_path: str) -> Frame:
+        """
+        Gets the metadata for the file path, reading the file header if it is not in the store yet.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            Frame: The frame.
+        """
+        key = self.get_file_key(file_path)
+        with self.frames_lock:
+            frame = self.frames.get(file_path)
+        if frame is None or frame.key != key:
+            frame = Frame(file_path, key, self.probe_metadata(file_path, key))
+            with self.frames_lock:
+                self.frames[file_path] = frame
+        return frame
+
+    def get_image(self, file_path: str, cache: bool = True) -> QImage:
+        """
+        Gets the full resolution image from the cache, decoding the file if it is not decoded yet, was evicted
+        or changed.
+
+        Args:
+            file_path (str): The path of the image file.
+            cache (bool): If False a decoded image is not added to the image cache, for callers that only keep a
+                scaled copy of it.
+
+        Returns:
+            QImage: The shared full resolution image.
+        """
+        key = self.get_file_key(file_path)
+        image = self.image_cache.get(key)
+        if image is None:
+            image = self.decode_shared(file_path, key, cache)
+        return image
+
+    def get_thumbnail(self, file_path: str) -> QImage:
+        """
+        Gets the preview image from the thumbnail disk cache, or creates it from the full resolution image and
+        writes it to the cache. The store does not keep it in memory.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            QImage: The thumbnail image, a null image if the file could not be decoded.
+        """
+        key = self.get_file_key(file_path)
+        thumbnail = self.thumbnail_cache.get(key, self.thumbnail_height)
+        if thumbnail is not None:
+            return thumbnail
+
+        image = self.get_image(file_path)
+        if image.isNull():
+            return QImage()
+        thumbnail = image.scaledToHeight(self.thumbnail_height, Qt.SmoothTransformation)
+
+        # Files that can not be read have no modification time, there is nothing to key them by.
+        if key[1]:
+            self.thumbnail_cache.put(key, self.thumbnail_height, thumbnail)
+        return thumbnail
+
+    def get_metadata(self, file_path: str) -> dict:
+        """
+        Gets the file and image information from the file header, without decoding the frame.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            dict: The metadata of the frame.
+        """
+        return self.get_frame(file_path).metadata
+
+    def probe_metadata(self, file_path: str, key: tuple) -> dict:
+        """
+        Reads the metadata from the file header, or from the video a frame comes from.
+
+        Args:
+            file_path (str): The path of the image file.
+            key (tuple): The cache key of the file.
+
+        Returns:
+            dict: The metadata of the frame.
+        """
+        video_source = self.get_video_frame(file_path)[0]
+        if video_source is not None:
+            return video_source.get_metadata(file_path)
+        return self.metadata_probe.get_metadata(file_path, key)
+
+    def set_cache_budget(self, cache_bytes: int) -> None:
+        """
+        Sets the memory budget for the decoded full resolution images.
+
+        Args:
+            cache_bytes (int): The number of bytes the cached images may use.
+        """
+        self.image_cache.set_max_bytes(cache_bytes)
+
+    def clear(self) -> None:
+        """
+        Removes all the frames from the store.
+        """
+        self.image_sequence = []
+        with self.frames_lock:
+            self.frames = {}
+        self.image_cache.clear()
+        self.metadata_probe.clear()
+        for video_source in self.video_sources.values():
+            video_source.close()
+        self.video_sources = {}
+        self.sequence_videos = set()
+        self.video_users = {}
@@ -1,21 +1,29 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableView
 import style_sheet
+from file_table_model import FileTableModel
 
 class FileTableWidget(QWidget):
-    def __init__(self, main_console_widget):
+    def __init__(self, main_console_widget, frame_store=None):
         """
         Initializes the user interface of the widget.
+
+        Args:
+            main_console_widget (QWidget): The console widget for displaying messages.
+            frame_store (FrameStore, optional): The store the file metadata is read from.
         """
         super().__init__()
 
         self.console = main_console_widget
+        self.frame_store = frame_store
 
         # Set up the layout
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        # Create the table view
-        self.table_widget = QTableWidget(self)
+        # Create the table view, the rows are only filled in when they scroll into view.
+        self.model = FileTableModel(self.frame_store.get_metadata if self.frame_store else None, self)
+        self.table_widget = QTableView(self)
+        self.table_widget.setModel(self.model)
         self.table_widget.setStyleSheet(style_sheet.table_widget_style())
         layout.addWidget(self.table_widget)
 
@@ -29,12 +37,31 @@ class FileTableWidget(QWidget):
         Sets the header at the top of the table.
         """
         try:
-            header_labels = ["Created At:", "File Name:", "File Path:", "File Size:", "Width", "Height", "Bit Depth"]
-            self.table_widget.setColumnCount(len(header_labels))
-            self.table_widget.setHorizontalHeaderLabels(header_labels)
+            # Size the columns from a sample of rows instead of measuring every row.
+            self.table_widget.horizontalHeader().setResizeContentsPrecision(50)
         except Exception as err:
             self.console.append_text("ERROR: set_header: {}".format(err.args))
 
+    def append_files(self, file_paths: list) -> None:
+        """
+        Adds an entry per file to the table in one go.
+
+        Args:
+            file_paths (list): The paths of the files.
+
+        Returns:
+            None
+        """
+        try:
+            resize_columns = self.model.rowCount() == 0
+            self.model.append_files(file_paths)
+
+            # Resize the columns to fit the content once, for the first files added.
+            if resize_columns:
+                self.table_widget.resizeColumnsToContents()
+        except Exception as err:
+            self.console.append_text("ERROR: append_files: {}".format(err.args))
+
     def append_data(self, creation_time, file_name, file_path, file_size, image_width, image_height, image_depth) -> None:
         """
         Adds an entry to the table.
@@ -52,20 +79,8 @@ class FileTableWidget(QWidget):
             None
         """
         try:
-            row_count = self.table_widget.rowCount()
-            self.table_widget.insertRow(row_count)
-
-            # Fill data in the new row
-            self.table_widget.setItem(row_count, 0, QTableWidgetItem(str(creation_time)))
-            self.table_widget.setItem(row_count, 1, QTableWidgetItem(str(file_name)))
-            self.table_widget.setItem(row_count, 2, QTableWidgetItem(str(file_path)))
-            self.table_widget.setItem(row_count, 3, QTableWidgetItem(str(file_size)))
-            self.table_widget.setItem(row_count, 4, QTableWidgetItem(str(image_width)))
-            self.table_widget.setItem(row_count, 5, QTableWidgetItem(str(image_height)))
-            self.table_widget.setItem(row_count, 6, QTableWidgetItem(str(image_depth)))
-
-            # Resize rows to fit content
-            self.table_widget.resizeColumnsToContents()
+            self.model.append_values(
+                [creation_time, file_name, file_path, file_size, image_width, image_height, image_depth])
         except Exception as err:
             self.console.append_text("ERROR: append_data: {}".format(err.args))
 
@@ -77,7 +92,6 @@ class FileTableWidget(QWidget):
             None
         """
         try:
-            self.table_widget.clearContents()
-            self.table_widget.setRowCount(0)
+            self.model.clear()
         except Exception as err:
             self.console.append_text("ERROR: clear_data: {}".format(err.args))
@@ -0,0 +1,20 @@
+import numpy as np
+from PyQt5.QtGui import QImage
+
+
+def image_to_array(image: QImage) -> np.ndarray:
+    """
+    Gets a (height, width, 4) array that shares its pixels with a 32-bit QImage.
+
+    Writing to the array writes to the image, so the image must outlive the array.
+
+    Args:
+        image (QImage): A 32-bit per pixel image, for example Format_ARGB32_Premultiplied.
+
+    Returns:
+        np.ndarray: The uint8 pixel array.
+    """
+    pointer = image.bits()
+    pointer.setsize(image.sizeInBytes())
+    array = np.frombuffer(pointer, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return array[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
@@ -1,17 +1,21 @@
-import os
-from PyQt5.QtCore import Qt, pyqtSignal, QFileInfo
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QScrollArea, QVBoxLayout
+from PyQt5.QtCore import QPoint, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QListView
 
 import style_sheet
+from thumbnail_strip import ThumbnailModel, ThumbnailDelegate
 
 
 class ImageSequenceWidget(QWidget):
-    """A widget for displaying an image sequence."""
+    """
+    A widget for displaying an image sequence.
+
+    The thumbnails are shown in a list view, which only paints the visible items, so the strip costs the same
+    for ten frames as for thousands.
+    """
 
     imageClicked = pyqtSignal(str)
 
-    def __init__(self, table_widget, control_widget, main_console_widget):
+    def __init__(self, table_widget, control_widget, main_console_widget, frame_store):
         """
         Initialize the ImageSequenceWidget.
 
@@ -19,9 +23,11 @@ class ImageSequenceWidget(QWidget):
             table_widget (QWidget): The table widget for displaying image information.
             control_widget (QWidget): The control widget for setting start and end frames.
             main_console_widget (QWidget): The console widget for displaying messages.
+            frame_store (FrameStore): The store holding the decoded frames.
         """
         super().__init__()
         self.table = table_widget
+        self.frame_store = frame_store
 
         self.console = main_console_widget
         self.controls = control_widget
@@ -31,19 +37,34 @@ class ImageSequenceWidget(QWidget):
 
         self.image_sequence = []
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-
-        self.content_widget = QWidget()
-        self.content_layout = QHBoxLayout(self.content_widget)
-
-        self.scroll_area.setWidget(self.content_widget)
-        self.scroll_area.setStyleSheet(style_sheet.scroll_bar_style())
-        self.scroll_area.setMinimumHeight(250)
-        self.scroll_area.setMaximumHeight(250)
+        self.model = ThumbnailModel(self.frame_store, self)
+        self.delegate = ThumbnailDelegate(self.frame_store.thumbnail_height, self)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setFlow(QListView.LeftToRight)
+        self.list_view.setWrapping(False)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setHorizontalScrollMode(QListView.ScrollPerPixel)
+        self.list_view.setSelectionMode(QListView.NoSelection)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setStyleSheet(style_sheet.image_grid_list_style())
+        self.list_view.setMinimumHeight(250)
+        self.list_view.setMaximumHeight(250)
+        self.list_view.clicked.connect(self.handle_image_click)
+
+        # Create the thumbnails around the part of the strip that is scrolled into view first. Reordering the
+        # queue visits every pending frame, so it waits until the scrolling pauses instead of running per step.
+        self.prioritize_timer = QTimer(self)
+        self.prioritize_timer.setInterval(50)
+        self.prioritize_timer.setSingleShot(True)
+        self.prioritize_timer.timeout.connect(self.prioritize_visible)
+        self.list_view.horizontalScrollBar().valueChanged.connect(lambda value: self.prioritize_timer.start())
 
         self.main_layout = QHBoxLayout(self)
-        self.main_layout.addWidget(self.scroll_area)
+        self.main_layout.addWidget(self.list_view)
 
         self.setLayout(self.main_layout)
 
@@ -57,90 +78,63 @@ class ImageSequenceWidget(QWidget):
             image_sequence_list (list): A list of image paths for the sequence.
         """
         try:
-            # Clear existing image widgets
-            for i in reversed(range(self.content_layout.count())):
-                widget_item = self.content_layout.itemAt(i)
-                if widget_item is not None:
-                    widget_item.widget().setParent(None)
-
-            # Load new image sequence
-            if image_sequence_list:
-                for image_path in image_sequence_list:
-                    self.set_table_info(image_path)
-                    self.console.append_text("INFO: Adding Image to grid: {}".format(image_path))
-                    image_widget = QWidget()
-                    image_layout = QVBoxLayout(image_widget)
-
-                    pixmap = QPixmap(image_path)
-                    pixmap = pixmap.scaledToHeight(150, Qt.SmoothTransformation)
-
-                    label = QLabel()
-                    label.setStyleSheet(style_sheet.image_grid_image_style())
-                    label.setPixmap(pixmap)
-                    label.setAlignment(Qt.AlignCenter)
-
-                    # Connect the clicked signal of the label to the slot function
-                    label.mousePressEvent = lambda event, path=image_path: self.handle_image_click(event, path)
-
-                    image_layout.addWidget(label)
-
-                    filename_label = QLabel(os.path.basename(image_path))
-                    filename_label.setStyleSheet(style_sheet.image_grid_label_style())
-                    filename_label.setAlignment(Qt.AlignCenter)
-
-                    # Connect the clicked signal of the label to the slot function
-                    filename_label.mousePressEvent = lambda event, path=image_path: self.handle_image_click(event, path)
+            self.image_sequence = list(image_sequence_list or [])
 
-                    image_layout.addWidget(filename_label)
+            # The view asks the model for the thumbnails it shows, nothing is created per frame up front.
+            self.model.set_sequence(self.image_sequence)
+            self.list_view.scrollToTop()
+            self.prioritize_visible()
 
-                    self.content_layout.addWidget(image_widget)
+            # The table reads the file information when the rows scroll into view.
+            self.table.append_files(self.image_sequence)
 
-            self.scroll_area.setWidget(self.content_widget)
-            self.updateGeometry()
+            for image_path in self.image_sequence:
+                self.console.append_verbose("INFO: Adding Image to grid: %s", image_path)
         except Exception as err:
             self.console.append_text("ERROR: {}".format(err.args))
 
-    def set_table_info(self, file_path):
+    def prioritize_visible(self, *args) -> None:
         """
-        Set image information in the table.
-
-        Args:
-            file_path (str): The path of the image file.
+        Moves the thumbnails of the visible frames to the front of the loader queue.
         """
+        row_count = self.model.rowCount()
+        if not row_count:
+            return
+
+        viewport = self.list_view.viewport().rect()
+        first_index = self.list_view.indexAt(QPoint(viewport.left() + 1, viewport.center().y()))
+        last_index = self.list_view.indexAt(QPoint(viewport.right() - 1, viewport.center().y()))
+
+        first_row = first_index.row() if first_index.isValid() else 0
+        if last_index.isValid():
+            last_row = last_index.row()
+        else:
+            # Past the last item, or before the view laid out its items. The items have a uniform size, so the
+            # visible rows follow from the width of the viewport.
+            item_width = self.delegate.item_size.width() + self.list_view.spacing() * 2
+            last_row = min(first_row + viewport.width() // item_width + 1, row_count - 1)
+        self.model.prioritize(first_row, last_row)
+
+    def shutdown(self) -> None:
+        """
+        Stops creating thumbnails, so the worker threads do not keep the application from exiting.
+        """
+        self.prioritize_timer.stop()
+        self.model.loader.shutdown()
 
-        file_info = QFileInfo(file_path)
-
-        # Extract file creation time
-        creation_time = file_info.created().toString(Qt.ISODate)
-
-        # Extract file name and file path
-        file_name = file_info.fileName()
-        file_path = file_info.filePath()
-
-        # Extract file size
-        file_size = file_info.size()
-        file_size_gb = file_size / (1024 * 1024)
-        formatted_file_size_gb = "{:.3f}GB".format(file_size_gb)
-
-        # Extract image width and height
-        pixmap = QPixmap(file_path)
-        image_width = pixmap.width()
-        image_height = pixmap.height()
-        bit_depth = pixmap.depth()
-
-        self.table.append_data(
-            creation_time, file_name, file_path, formatted_file_size_gb, image_width, image_height,
-            "{}bit".format(bit_depth))
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self.prioritize_timer.start()
 
-    def handle_image_click(self, event, image_path):
+    def handle_image_click(self, index):
         """
         Handle the click event on an image.
 
         Args:
-            event (QMouseEvent): The mouse event.
-            image_path (str): The path of the clicked image.
+            index (QModelIndex): The index of the clicked image.
         """
-        if event.button() == Qt.LeftButton:
+        image_path = index.data(ThumbnailModel.FilePathRole)
+        if image_path:
             self.imageClicked.emit(image_path)
 
     
\ No newline at end of file
@@ -10,15 +10,17 @@ from PyQt5.QtWidgets import QLabel, QVBoxLayout, QScrollArea, QWidget, QGraphics
 class ImageViewerWidget(QWidget):
     imagepathClicked = pyqtSignal(str)
 
-    def __init__(self, main_console_widget):
+    def __init__(self, main_console_widget, frame_store):
         """Initialize the ImageViewerWidget.
 
         Args:
             main_console_widget (QWidget): The console widget for displaying messages.
+            frame_store (FrameStore): The store holding the decoded frames.
         """
         super().__init__()
 
         self.console = main_console_widget
+        self.frame_store = frame_store
 
         self.setMouseTracking(True)
         self.scroll_pos = None
@@ -76,7 +78,7 @@ class ImageViewerWidget(QWidget):
         """
         try:
             image_path = image_sequence[frame_index]
-            self.original_pixmap = QPixmap(image_path)
+            self.original_pixmap = QPixmap.fromImage(self.frame_store.get_image(image_path))
             self.scene.clear()
             self.scene.addPixmap(self.original_pixmap)
             self.fit_to_widget()
@@ -94,7 +96,7 @@ class ImageViewerWidget(QWidget):
             if file_path:
                 self.set_display_name_label(file_path)
                 self.console.append_text("Info: Selected image: {}".format(os.path.basename(file_path)))
-                self.original_pixmap = QPixmap(file_path)
+                self.original_pixmap = QPixmap.fromImage(self.frame_store.get_image(file_path))
                 self.scene.clear()
                 self.scene.addPixmap(self.original_pixmap)
                 self.fit_to_widget()
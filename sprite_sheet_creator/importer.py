@@ -5,22 +5,37 @@ import tempfile
 
 import cv2
 from PIL import Image
-from PyQt5.QtGui import QImageReader
+from PyQt5.QtGui import QImage, QImageReader
 from PyQt5.QtWidgets import QFileDialog
 from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
-from moviepy.video.io.VideoFileClip import VideoFileClip
+
+from image_array import image_to_array
+from job_engine import JobCancelled
+from video_index import VideoIndexCache
+from video_source import VideoSource
 
 
 class ImportExporter:
+    """
+    Imports and exports image sequences, sprite sheets and scripts.
+
+    The file dialogs and control values are read on the GUI thread, the reading, writing and encoding then runs
+    as a cancellable background job on the job engine, so the window keeps responding during long exports.
+    """
 
-    def __init__(self, main_console_widget, control_widget, statusbar_widget):
+    def __init__(self, main_console_widget, control_widget, statusbar_widget, frame_store, job_engine):
         self.path = None
         self.console = main_console_widget
         self.statusbar = statusbar_widget
         self.control = control_widget
+        self.frame_store = frame_store
+        self.jobs = job_engine
 
         self.image_sequence = []
 
+        # The keyframe index of each imported video, built the first time the video is opened.
+        self.video_indexes = VideoIndexCache()
+
         self.temp_directory = "{}/{}".format(tempfile.gettempdir(), "SuperSprite_Temp")
         if not os.path.exists(self.temp_directory):
             os.mkdir(self.temp_directory)
@@ -38,24 +53,84 @@ class ImportExporter:
             print(err.args)
             self.console.append_text("ERROR: clean_up_temp_directory: {}".format(err.args))
 
-    def import_image_sequence(self) -> list:
+    def set_image_sequence(self, on_imported, image_sequence: list) -> None:
+        """
+        Keeps the imported sequence and hands it to the caller. Runs on the GUI thread.
+
+        Args:
+            on_imported (callable): Called with the imported sequence.
+            image_sequence (list): The file paths of the imported frames.
+        """
+        if image_sequence:
+            self.image_sequence = image_sequence
+            on_imported(image_sequence)
+
+    def set_video_sequence(self, on_imported, video_source: VideoSource) -> None:
+        """
+        Registers an opened video with the frame store and hands its frames to the caller. Runs on the GUI thread,
+        so the job opening the video never changes the videos the widgets and running jobs read from.
+
+        Args:
+            on_imported (callable): Called with the frame paths of the video.
+            video_source (VideoSource): The opened video.
+        """
+        self.frame_store.add_video_source(video_source)
+        self.set_image_sequence(on_imported, video_source.get_frame_paths())
+
+    def submit_frame_job(self, name: str, function, image_sequence: list, *args) -> int:
+        """
+        Submits a job that reads the frames of a sequence. The videos the frames come from stay open until the
+        job ended, even if another sequence is imported meanwhile.
+
+        Args:
+            name (str): The name of the job shown in the status bar.
+            function (callable): The job function, called with the JobContext, the sequence and the arguments.
+            image_sequence (list): The paths of the frames the job reads.
+            *args: The other arguments of the function.
+
+        Returns:
+            int: The id of the job.
+        """
+        video_paths = self.frame_store.acquire_videos(image_sequence)
+        return self.jobs.submit(name, function, image_sequence, *args,
+                                on_done=lambda: self.frame_store.release_videos(video_paths))
+
+    def import_image_sequence(self, on_imported) -> None:
         """
         Imports an image sequence from a selected directory.
+
+        Args:
+            on_imported (callable): Called on the GUI thread with the imported sequence.
         """
         try:
-            self.statusbar.set_progress_maximum(100)
             # Open file dialog to select directory
             directory = QFileDialog.getExistingDirectory(caption="Select Sequence Directory.")
             if directory:
-                # TODO: consider an option to choose which order to import them in rather than by creation time.
-                # Retrieve image files from the selected directory and sort them by creation time.
-                # This keeps the frames in the correct order regardless of name.
-                self.image_sequence = sorted([str(os.path.join(directory, filename)).replace("\\", "/") for filename in os.listdir(directory)], key=os.path.getctime)
-                self.statusbar.update_progressbar(75)
-                return self.image_sequence
+                self.jobs.submit("Importing Image Sequence", self.read_image_sequence, directory,
+                                 on_finished=lambda sequence: self.set_image_sequence(on_imported, sequence))
         except Exception as err:
             self.console.append_text("ERROR: import_image_sequence: {}".format(err.args))
 
+    def read_image_sequence(self, job, directory: str) -> list:
+        """
+        Lists the frames of a sequence directory. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            directory (str): The sequence directory.
+
+        Returns:
+            list: The file paths of the frames.
+        """
+        # TODO: consider an option to choose which order to import them in rather than by creation time.
+        # Retrieve image files from the selected directory and sort them by creation time.
+        # This keeps the frames in the correct order regardless of name.
+        image_sequence = sorted([str(os.path.join(directory, filename)).replace("\\", "/") for filename in os.listdir(directory)], key=os.path.getctime)
+
+        # The widgets are filled from the paths straight away and decode the frames they show in the background.
+        job.check_cancelled()
+        return image_sequence
+
     def export_image_sequence(self, image_sequence: list) -> None:
         """
         Exports the image sequence to the defined directory.
@@ -69,36 +144,60 @@ class ImportExporter:
                     if start <= 0:
                         start = 0
                     end = self.control.get_end_frame_value()
-                    self.statusbar.set_progress_maximum(end)
-
-                    for index, image_filepath in enumerate(image_sequence[start:end]):
-                        destination_filepath = os.path.join(sequence_directory, os.path.basename(image_filepath))
-                        self.statusbar.update_progressbar(index)
 
-                        try:
-                            shutil.copy(image_filepath, destination_filepath)
-                        except FileNotFoundError:
-                            self.console.append_text(f"ERROR: File not found: {image_filepath}")
-                            continue
-
-                self.console.append_text("INFO: Image Sequence Exported: {}".format(sequence_directory))
+                    self.submit_frame_job("Exporting Image Sequence", self.copy_image_sequence,
+                                          image_sequence[start:end], sequence_directory)
             else:
                 self.console.append_text("Warning: Nothing to export.")
 
         except Exception as err:
             self.console.append_text("ERROR: export_image_sequence: {}".format(err.args))
 
-    def export_sprite_sheet(self, pixmap_image) -> None:
+    def copy_image_sequence(self, job, image_sequence: list, sequence_directory: str) -> None:
+        """
+        Copies the frames to the export directory. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            image_sequence (list): The file paths of the frames to export.
+            sequence_directory (str): The export directory.
+        """
+        job.set_maximum(len(image_sequence))
+
+        for index, image_filepath in enumerate(image_sequence):
+            job.check_cancelled()
+            job.progress(index)
+
+            # The frames of a video only exist in the video, they are written out as PNG files here.
+            if self.frame_store.is_video_frame(image_filepath):
+                destination_filepath = os.path.join(
+                    sequence_directory, VideoSource.get_export_file_name(image_filepath))
+                self.frame_store.get_image(image_filepath).save(destination_filepath)
+                continue
+
+            destination_filepath = os.path.join(sequence_directory, os.path.basename(image_filepath))
+            try:
+                shutil.copy(image_filepath, destination_filepath)
+            except FileNotFoundError:
+                self.console.append_text(f"ERROR: File not found: {image_filepath}")
+                continue
+
+        self.console.append_text("INFO: Image Sequence Exported: {}".format(sequence_directory))
+
+    def export_sprite_sheet(self, sprite_sheet_image) -> None:
         """
         Save the sprite sheet image as a PNG file.
 
         The image is saved based on the provided parameters and user input.
 
+        Args:
+            sprite_sheet_image: (QImage): The sprite sheet with any overlays already baked in.
+
         Returns:
             None
         """
         try:
-            if pixmap_image:
+            if sprite_sheet_image is not None and not sprite_sheet_image.isNull():
                 # Calculate the number of rows and columns in the sprite sheet
                 num_rows = self.control.get_grid_rows_value()
                 num_columns = self.control.get_grid_columns_value()
@@ -115,62 +214,115 @@ class ImportExporter:
                 # Open a file dialog to get the save file path
                 file_path, _ = QFileDialog.getSaveFileName(caption=filename, directory=filename, filter="PNG Image (*.png)")
                 if file_path:
-                    # Save the sprite sheet image to the specified file path
-                    pixmap_image.save(file_path)
-
-                    # open a popup dialog with a button the user can click to open the output directory in the file explorer.
-                    self.path = os.path.dirname(file_path)
-                    os.startfile(self.path)
-
-                self.statusbar.update_progressbar(50)
+                    # Without overlays this is the sheet buffer itself, which the next rebuild paints into on the GUI
+                    # thread. The job saves a copy of its own, so it never reads pixels that are being repainted.
+                    self.jobs.submit("Exporting Sprite Sheet", self.save_sprite_sheet, sprite_sheet_image.copy(), file_path,
+                                     on_finished=self.open_export_directory)
 
         except Exception as err:
             self.console.append_text("ERROR: export_sprite_sheet: {}".format(err.args))
 
-    def import_as_gif(self) -> list:
+    def save_sprite_sheet(self, job, sprite_sheet_image, file_path: str) -> str:
+        """
+        Saves the sprite sheet image. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            sprite_sheet_image (QImage): The sprite sheet.
+            file_path (str): The path of the PNG file.
+
+        Returns:
+            str: The directory of the saved file.
+        """
+        # Save the sprite sheet image to the specified file path
+        if not sprite_sheet_image.save(file_path):
+            raise IOError("Could not save {}".format(file_path))
+        return os.path.dirname(file_path)
+
+    def open_export_directory(self, directory: str) -> None:
+        """
+        Opens the output directory in the file explorer.
+
+        Args:
+            directory (str): The directory to open.
+        """
+        # open a popup dialog with a button the user can click to open the output directory in the file explorer.
+        self.path = directory
+        os.startfile(self.path)
+
+    def import_as_gif(self, on_imported) -> None:
         """
         Imports a gif file and converts it to an image sequence.
+
+        Args:
+            on_imported (callable): Called on the GUI thread with the imported sequence.
         """
         try:
-            converted_path = []
             gif_path, _ = QFileDialog.getOpenFileName(caption="Graphics Interchange Files", filter="Gif Files (*.gif)")
+            if gif_path:
+                self.jobs.submit("Importing GIF", self.read_gif_frames, gif_path,
+                                 on_finished=lambda sequence: self.set_image_sequence(on_imported, sequence))
+        except Exception as err:
+            self.console.append_text("ERROR: import_as_gif: {}".format(err.args))
 
-            # Load the GIF file using QImageReader
-            gif_reader = QImageReader(gif_path)
-            gif_reader.setDecideFormatFromContent(True)
-            frame_count = gif_reader.imageCount()
+    def read_gif_frames(self, job, gif_path: str) -> list:
+        """
+        Saves the frames of a gif file as an image sequence. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            gif_path (str): The path of the gif file.
 
-            self.statusbar.set_progress_maximum(frame_count)
+        Returns:
+            list: The file paths of the frames.
+        """
+        converted_path = []
 
-            # Create the output directory if it doesn't exist
-            output_dir = "{}/{}".format(self.temp_directory, "converted")
+        # Load the GIF file using QImageReader
+        gif_reader = QImageReader(gif_path)
+        gif_reader.setDecideFormatFromContent(True)
+        frame_count = gif_reader.imageCount()
 
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+        job.set_maximum(frame_count)
 
-            if os.path.exists(output_dir) and os.path.isdir(output_dir):
-                shutil.rmtree(output_dir)
-                os.makedirs(output_dir)
+        output_dir = self.reset_converted_directory()
 
-            # Iterate over each frame of the GIF and save as separate images
-            for frame_index in range(frame_count):
-                self.statusbar.update_progressbar(frame_index)
-                gif_reader.jumpToImage(frame_index)
-                image = gif_reader.read()
+        # Iterate over each frame of the GIF and save as separate images
+        for frame_index in range(frame_count):
+            job.check_cancelled()
+            job.progress(frame_index)
+            gif_reader.jumpToImage(frame_index)
+            image = gif_reader.read()
 
-                # Generate the output file path for the current frame
-                output_path = os.path.join(output_dir, f"{frame_index}.png")
+            # Generate the output file path for the current frame
+            output_path = os.path.join(output_dir, f"{frame_index}.png")
 
-                # Save the image as PNG
-                image.save(output_path)
-                converted_path.append(output_path.replace("\\", "/"))
+            # Save the image as PNG
+            image.save(output_path)
+            converted_path.append(output_path.replace("\\", "/"))
 
-                print(f"Frame {frame_index} saved as {output_path}")
+            self.console.append_verbose("INFO: Frame %s saved as %s", frame_index, output_path)
 
-            self.image_sequence = converted_path
-            return self.image_sequence
-        except Exception as err:
-            self.console.append_text("ERROR: import_as_gif: {}".format(err.args))
+        return converted_path
+
+    def reset_converted_directory(self) -> str:
+        """
+        Creates an empty directory for the converted frames.
+
+        Returns:
+            str: The path of the directory.
+        """
+        # Create the output directory if it doesn't exist
+        output_dir = "{}/{}".format(self.temp_directory, "converted")
+
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        if os.path.exists(output_dir) and os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+            os.makedirs(output_dir)
+
+        return output_dir
 
     def export_as_gif(self, image_sequence: list) -> None:
         """
@@ -188,9 +340,6 @@ class ImportExporter:
             # Convert the fps to a duration value and trim the length.
             duration = round(1/fps, 3)
 
-            # update the progress bar max value
-            self.statusbar.set_progress_maximum(end_frame)
-
             # The image sequence
             sequence = image_sequence[start_frame:end_frame]
 
@@ -201,86 +350,136 @@ class ImportExporter:
                 filter="GIF Files (*.gif)")
 
             if save_path and sequence:
-                images = []
-                index = 0
-                for file_path in sequence:
-                    index += 1
-                    if os.path.exists(file_path):
-                        self.statusbar.update_progressbar(index)
-                        image = Image.open(file_path)
-                        images.append(image)
-
-                if images:
-                    images[0].save(
-                        save_path,
-                        format='GIF',
-                        version='GIF89a',
-                        save_all=True,
-                        append_images=images[1:],
-                        duration=duration,  # Set the duration between frames (in milliseconds)
-                        # fps=fps,
-                        loop=0,
-                        disposal=2,
-                        background=255)
-
-                self.statusbar.update_progressbar(end_frame)
+                self.submit_frame_job("Exporting GIF", self.write_gif, sequence, save_path, duration)
             else:
                 print("WARNING: export_as_gif: Image sequence not provided.")
         except Exception as err:
             self.console.append_text("ERROR: export_as_gif: {}".format(err.args))
 
+    def write_gif(self, job, sequence: list, save_path: str, duration: float) -> None:
+        """
+        Writes the frames to a gif file. Runs as a background job.
 
-    def import_as_mp4(self) -> list:
+        Args:
+            job (JobContext): The context of the running job.
+            sequence (list): The file paths of the frames to export.
+            save_path (str): The path of the gif file.
+            duration (float): The duration of each frame.
         """
-        Imports a .MP4 file and converts it to an image sequence.
-        This MP4 may contain audio information. Maybe this can be re-used?
+        job.set_maximum(len(sequence))
+
+        images = []
+        index = 0
+        for file_path in sequence:
+            job.check_cancelled()
+            index += 1
+            if os.path.exists(file_path) or self.frame_store.is_video_frame(file_path):
+                job.progress(index)
+                image = self.open_frame(file_path)
+                images.append(image)
+
+        if images:
+            images[0].save(
+                save_path,
+                format='GIF',
+                version='GIF89a',
+                save_all=True,
+                append_images=images[1:],
+                duration=duration,  # Set the duration between frames (in milliseconds)
+                # fps=fps,
+                loop=0,
+                disposal=2,
+                background=255)
+
+    def open_frame(self, file_path: str) -> Image.Image:
         """
-        try:
-            video_path, _ = QFileDialog.getOpenFileName(caption="Select Video File", filter="MP4 (*.mp4)")
+        Opens a frame with PIL, the frames of a video are read from the frame store.
+
+        Args:
+            file_path (str): The path of the image file or the frame path.
+
+        Returns:
+            Image.Image: The frame.
+        """
+        if self.frame_store.is_video_frame(file_path):
+            return Image.fromarray(cv2.cvtColor(self.read_frame(file_path), cv2.COLOR_BGR2RGB))
+        return Image.open(file_path)
 
-            # Create the output directory if it doesn't exist
-            output_dir = "{}/{}".format(self.temp_directory, "converted")
+    def read_frame(self, file_path: str):
+        """
+        Reads a frame as a BGR array for OpenCV, the frames of a video are read from the frame store.
 
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+        Args:
+            file_path (str): The path of the image file or the frame path.
 
-            if os.path.exists(output_dir) and os.path.isdir(output_dir):
-                shutil.rmtree(output_dir)
-                os.makedirs(output_dir)
+        Returns:
+            np.ndarray: The (height, width, 3) frame.
+        """
+        if not self.frame_store.is_video_frame(file_path):
+            return cv2.imread(file_path)
+        image = self.frame_store.get_image(file_path).convertToFormat(QImage.Format_RGB32)
+        return cv2.cvtColor(image_to_array(image), cv2.COLOR_BGRA2BGR)
 
+    def import_as_mp4(self, on_imported) -> None:
+        """
+        Imports a .MP4 file as an image sequence.
+        This MP4 may contain audio information. Maybe this can be re-used?
+
+        Args:
+            on_imported (callable): Called on the GUI thread with the imported sequence.
+        """
+        try:
+            video_path, _ = QFileDialog.getOpenFileName(caption="Select Video File", filter="MP4 (*.mp4)")
             if video_path:
-                video = VideoFileClip(video_path)
-                frames = video.iter_frames()
-
-                # Get the number of frames in the video
-                duration = video.duration
-                fps = video.fps
-                frame_count = int(duration * fps)
-                self.statusbar.set_progress_maximum(frame_count)
-
-                # save out each frame, so we can use them as a sequence.
-                for i, frame in enumerate(frames):
-                    self.statusbar.update_progressbar(i)
-                    image = Image.fromarray(frame)
-                    file_name = f"{output_dir}/{i}.png"
-                    image.save(file_name)
-                    print(f"Saved: {file_name}")
-
-            self.image_sequence = sorted([str(os.path.join(output_dir, filename)).replace("\\", "/") for filename in os.listdir(output_dir)], key=os.path.getctime)
-
-            return self.image_sequence
+                self.jobs.submit("Importing MP4", self.read_mp4_frames, video_path,
+                                 on_finished=lambda video_source: self.set_video_sequence(on_imported, video_source))
         except Exception as err:
             self.console.append_text("ERROR: import_as_mp4: {}".format(err.args))
 
+    def read_mp4_frames(self, job, video_path: str) -> VideoSource:
+        """
+        Opens a video file as an image sequence. Runs as a background job.
+
+        The frames are decoded from the video by the frame store, no image files are written. The keyframes
+        are indexed the first time a video is opened, so any frame can be decoded from the keyframe before it.
+
+        Args:
+            job (JobContext): The context of the running job.
+            video_path (str): The path of the video file.
+
+        Returns:
+            VideoSource: The opened video, registered with the frame store on the GUI thread.
+        """
+        video_path = video_path.replace("\\", "/")
+
+        capture = cv2.VideoCapture(video_path)
+        job.set_maximum(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)))
+        capture.release()
+
+        video_index = self.video_indexes.get_index(video_path, job.progress, job.is_cancelled)
+        job.check_cancelled()
+        if video_index is None:
+            self.console.append_text("WARNING: No keyframe index for: {}, seeking may be slow.".format(video_path))
+
+        video_source = VideoSource(video_path, video_index)
+        # A job cancelled while the video was opened never hands it to the frame store, so it is released here.
+        try:
+            job.check_cancelled()
+        except JobCancelled:
+            video_source.close()
+            raise
+        self.console.append_text("INFO: Opened video: {} frames, {}x{} at {} fps.".format(
+            video_source.frame_count, video_source.width, video_source.height, round(video_source.fps, 3)))
+
+        return video_source
+
     def export_as_mp4(self, image_sequence: list) -> None:
         """
         Exports the image sequence as an .mp4 file.
         """
         try:
             if image_sequence:
-                self.statusbar.set_progress_maximum(len(image_sequence))
                 fps = self.control.get_fps_value()
-                codec = "mp4v"
                 filename = "Movie_000.mp4"
                 save_path, _ = QFileDialog.getSaveFileName(
                     caption="Save MP4 file",
@@ -288,32 +487,46 @@ class ImportExporter:
                     filter="MP4 Files (*.mp4)")
 
                 if save_path:
-                    # Get the image dimensions from the first image in the sequence
-                    first_image = cv2.imread(image_sequence[0])
-                    height, width, _ = first_image.shape
-
-                    video_writer = cv2.VideoWriter(save_path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
-
-                    for index, image_path in image_sequence:
-                        self.statusbar.update_progressbar(index)
-                        frame = cv2.imread(image_path)
-                        video_writer.write(frame)
-
-                    video_writer.release()
+                    self.submit_frame_job("Exporting MP4", self.write_mp4, list(image_sequence), save_path, fps)
             else:
                 self.console.append_text("WARNING: No images to export.")
         except Exception as err:
             self.console.append_text("ERROR: export_as_mp4: {}".format(err.args))
 
+    def write_mp4(self, job, image_sequence: list, save_path: str, fps: int) -> None:
+        """
+        Encodes the frames to an .mp4 file. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            image_sequence (list): The file paths of the frames.
+            save_path (str): The path of the video file.
+            fps (int): The frame rate of the video.
+        """
+        codec = "mp4v"
+        job.set_maximum(len(image_sequence))
+
+        # Get the image dimensions from the first image in the sequence
+        first_image = self.read_frame(image_sequence[0])
+        height, width, _ = first_image.shape
+
+        video_writer = cv2.VideoWriter(save_path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+        try:
+            for index, image_path in enumerate(image_sequence):
+                job.check_cancelled()
+                job.progress(index)
+                frame = self.read_frame(image_path)
+                video_writer.write(frame)
+        finally:
+            video_writer.release()
+
     def export_as_webm(self, image_sequence: list) -> None:
         """
         exports the image sequence as a .webm file.
         """
         try:
             if image_sequence:
-                self.statusbar.set_progress_maximum(len(image_sequence))
                 fps = self.control.get_fps_value()
-                codec = "libvpx-vp9"
                 filename = "Webm_000.webm"  # Change the filename extension to .webm
                 save_path, _ = QFileDialog.getSaveFileName(
                     caption="Save Webm file",
@@ -321,32 +534,50 @@ class ImportExporter:
                     filter="Webm Files (*.webm)")
 
                 if save_path:
-                    # Create a temporary directory to store the images
-                    temp_dir = tempfile.mkdtemp()
-
-                    # Copy the image_sequence to the temporary directory
-                    for i, image_path in enumerate(image_sequence):
-                        shutil.copy(image_path, os.path.join(temp_dir, f"frame_{i:04d}.png"))
-                        self.statusbar.update_progressbar(i)
+                    self.submit_frame_job("Exporting Webm", self.write_webm, list(image_sequence), save_path, fps)
 
-                    # Create an ImageSequenceClip from the images in the temporary directory
-                    image_sequence_clip = ImageSequenceClip(temp_dir, fps=fps)
+        except Exception as err:
+            self.console.append_text("ERROR: export_as_webm: {}".format(err.args))
 
-                    # Save the clip as .webm using the specified codec
-                    image_sequence_clip.write_videofile(save_path, codec=codec)
+    def write_webm(self, job, image_sequence: list, save_path: str, fps: int) -> None:
+        """
+        Encodes the frames to a .webm file. Runs as a background job.
 
-                    # Remove the temporary directory and its contents
-                    shutil.rmtree(temp_dir)
+        Args:
+            job (JobContext): The context of the running job.
+            image_sequence (list): The file paths of the frames.
+            save_path (str): The path of the video file.
+            fps (int): The frame rate of the video.
+        """
+        codec = "libvpx-vp9"
+        job.set_maximum(len(image_sequence))
 
-        except Exception as err:
-            self.console.append_text("ERROR: export_as_webm: {}".format(err.args))
+        # Create a temporary directory to store the images
+        temp_dir = tempfile.mkdtemp()
+        try:
+            # Copy the image_sequence to the temporary directory
+            for i, image_path in enumerate(image_sequence):
+                job.check_cancelled()
+                if self.frame_store.is_video_frame(image_path):
+                    self.frame_store.get_image(image_path).save(os.path.join(temp_dir, f"frame_{i:04d}.png"))
+                else:
+                    shutil.copy(image_path, os.path.join(temp_dir, f"frame_{i:04d}.png"))
+                job.progress(i)
+
+            # Create an ImageSequenceClip from the images in the temporary directory
+            image_sequence_clip = ImageSequenceClip(temp_dir, fps=fps)
+
+            # Save the clip as .webm using the specified codec
+            image_sequence_clip.write_videofile(save_path, codec=codec)
+        finally:
+            # Remove the temporary directory and its contents
+            shutil.rmtree(temp_dir)
 
     def save_script(self, name: str, script: str) -> None:
         """
         Saves the script to the specified directory.
         """
         try:
-            self.statusbar.set_progress_maximum(100)
             if script:
                 filename = "{}_Animation_Script.txt".format(name)
                 save_path, _ = QFileDialog.getSaveFileName(
@@ -354,10 +585,19 @@ class ImportExporter:
                     directory=filename,
                     filter="Text Files (*.txt)")
                 if save_path:
-                    with open(save_path, "w") as file:
-                        file.write(script)
-
-            self.statusbar.update_progressbar(75)
+                    self.jobs.submit("Saving Script", self.write_script, script, save_path)
 
         except Exception as err:
             self.console.append_text("ERROR: save_script: {}".format(err.args))
+
+    def write_script(self, job, script: str, save_path: str) -> None:
+        """
+        Writes the script to a text file. Runs as a background job.
+
+        Args:
+            job (JobContext): The context of the running job.
+            script (str): The script text.
+            save_path (str): The path of the text file.
+        """
+        with open(save_path, "w") as file:
+            file.write(script)
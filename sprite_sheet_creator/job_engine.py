@@ -0,0 +1,218 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it was cancelled."""
+
+
+class JobContext:
+    """
+    Passed to a running job to report its progress and check if it was cancelled.
+
+    The progress is sent to the GUI thread as a queued signal, so a job never touches a widget.
+    """
+
+    def __init__(self, engine, job_id: int, name: str):
+        """
+        Initialize the JobContext.
+
+        Args:
+            engine (JobEngine): The engine running the job.
+            job_id (int): The id of the job.
+            name (str): The name of the job shown in the status bar.
+        """
+        self.engine = engine
+        self.job_id = job_id
+        self.name = name
+        self.maximum = 0
+        self.cancel_event = threading.Event()
+
+    def set_maximum(self, maximum: int) -> None:
+        """
+        Sets the number of steps of the job.
+
+        Args:
+            maximum (int): The progress value once the job is done.
+        """
+        self.maximum = maximum
+        self.engine.jobProgress.emit(self.job_id, 0, self.maximum)
+
+    def progress(self, value: int) -> None:
+        """
+        Reports the progress of the job.
+
+        Args:
+            value (int): The number of steps done.
+        """
+        self.engine.jobProgress.emit(self.job_id, value, self.maximum)
+
+    def is_cancelled(self) -> bool:
+        """
+        Checks if the job was cancelled.
+
+        Returns:
+            bool: True if the job should stop.
+        """
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """
+        Stops the job if it was cancelled.
+
+        Raises:
+            JobCancelled: If the job was cancelled.
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+
+class JobEngine(QObject):
+    """
+    Runs the import, export and script jobs on a pool of background threads.
+
+    A job is a function called with a JobContext and its arguments. The engine reports each job's state with
+    queued signals, and calls the job's finished callback on the GUI thread with its result. Several jobs can
+    run at the same time while the window keeps responding.
+
+    The jobs share the decoded frames of the FrameStore, so they run on threads rather than processes.
+    """
+
+    jobStarted = pyqtSignal(int, str)
+    jobProgress = pyqtSignal(int, int, int)
+    jobFinished = pyqtSignal(int, object)
+    jobFailed = pyqtSignal(int, str)
+    jobCancelled = pyqtSignal(int)
+
+    def __init__(self, main_console_widget, max_workers: int = 4, parent=None):
+        """
+        Initialize the JobEngine.
+
+        Args:
+            main_console_widget (QWidget): The console widget for displaying messages.
+            max_workers (int): The number of jobs that can run at the same time.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.console = main_console_widget
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Job")
+        self.job_ids = itertools.count(1)
+
+        # The contexts, finished callbacks and done callbacks of the jobs that did not finish yet, by job id.
+        self.jobs = {}
+        self.callbacks = {}
+        self.done_callbacks = {}
+
+        self.jobFinished.connect(self.handle_finished)
+        self.jobFailed.connect(self.handle_done)
+        self.jobCancelled.connect(self.handle_done)
+
+        self.console.append_text("INFO: Job Engine Loaded.")
+
+    def submit(self, name: str, function, *args, on_finished=None, on_done=None) -> int:
+        """
+        Runs a function as a background job.
+
+        Args:
+            name (str): The name of the job shown in the status bar.
+            function (callable): Called on a worker thread with the JobContext and the arguments.
+            *args: The arguments of the function.
+            on_finished (callable, optional): Called on the GUI thread with the result of the function.
+            on_done (callable, optional): Called on the GUI thread once the job ended, whether it finished,
+                failed or was cancelled.
+
+        Returns:
+            int: The id of the job.
+        """
+        job_id = next(self.job_ids)
+        context = JobContext(self, job_id, name)
+        self.jobs[job_id] = context
+        if on_finished is not None:
+            self.callbacks[job_id] = on_finished
+        if on_done is not None:
+            self.done_callbacks[job_id] = on_done
+
+        self.jobStarted.emit(job_id, name)
+        self.executor.submit(self.run, context, function, args)
+        return job_id
+
+    def run(self, context: JobContext, function, args: tuple) -> None:
+        """
+        Runs a job and reports how it ended. Runs on a worker thread.
+
+        Args:
+            context (JobContext): The context of the job.
+            function (callable): The job function.
+            args (tuple): The arguments of the function.
+        """
+        try:
+            context.check_cancelled()
+            result = function(context, *args)
+            context.check_cancelled()
+            self.jobFinished.emit(context.job_id, result)
+        except JobCancelled:
+            self.console.append_text("WARNING: {} cancelled.".format(context.name))
+            self.jobCancelled.emit(context.job_id)
+        except Exception as err:
+            self.console.append_text("ERROR: {}: {}".format(context.name, err.args))
+            self.jobFailed.emit(context.job_id, str(err))
+
+    def handle_finished(self, job_id: int, result) -> None:
+        """
+        Calls the finished callback of a job on the GUI thread.
+
+        Args:
+            job_id (int): The id of the job.
+            result: The value the job function returned.
+        """
+        callback = self.callbacks.get(job_id)
+        self.handle_done(job_id)
+        if callback is not None:
+            try:
+                callback(result)
+            except Exception as err:
+                self.console.append_text("ERROR: handle_finished: {}".format(err.args))
+
+    def handle_done(self, job_id: int, *args) -> None:
+        """
+        Forgets a job that ended.
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        self.jobs.pop(job_id, None)
+        self.callbacks.pop(job_id, None)
+        on_done = self.done_callbacks.pop(job_id, None)
+        if on_done is not None:
+            try:
+                on_done()
+            except Exception as err:
+                self.console.append_text("ERROR: handle_done: {}".format(err.args))
+
+    def cancel(self, job_id: int) -> None:
+        """
+        Asks a job to stop, it stops the next time it checks if it was cancelled.
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        context = self.jobs.get(job_id)
+        if context is not None:
+            context.cancel_event.set()
+
+    def cancel_all(self) -> None:
+        """
+        Asks all the running and waiting jobs to stop.
+        """
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def shutdown(self) -> None:
+        """
+        Cancels the jobs and waits for the worker threads to stop.
+        """
+        self.cancel_all()
+        self.executor.shutdown(wait=True)
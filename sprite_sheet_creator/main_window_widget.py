@@ -11,10 +11,12 @@ import style_sheet
 from console_widget import ConsoleWidget
 from controls_widget import ControlWidget
 from converter import DirectConverter
+from frame_store import FrameStore
 from higherarchy_widget import FileTableWidget
 from image_grid_widget import ImageSequenceWidget
 from image_viewer_widget import ImageViewerWidget
 from importer import ImportExporter
+from job_engine import JobEngine
 from menu_bar_widget import MenuBar
 from playback_widget import PlaybackWidget
 from script_generator import ScriptGenerator
@@ -85,7 +87,10 @@ class MainWindow(QMainWindow):
         self.main_console_widget.append_text("Super Sprite {}".format(self.version_number))
         self.main_console_widget.append_text("")
 
-        self.table = FileTableWidget(self.main_console_widget)
+        # Decode each frame on demand and share it with all the widgets.
+        self.frame_store = FrameStore(self.main_console_widget)
+
+        self.table = FileTableWidget(self.main_console_widget, self.frame_store)
         self.table_dock_widget = QDockWidget("Table")
         self.table_dock_widget.setWidget(self.table)
         self.table_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
@@ -101,33 +106,45 @@ class MainWindow(QMainWindow):
         self.control_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.control_dock_widget.setStyleSheet(style_sheet.dock_widget_style())
 
-        self.image_sequence_widget = ImageSequenceWidget(self.table, self.control_widget, self.main_console_widget)
+        self.image_sequence_widget = ImageSequenceWidget(self.table, self.control_widget, self.main_console_widget,
+                                                         self.frame_store)
         self.image_sequence_dock_widget = QDockWidget("Image Sequence")
         self.image_sequence_dock_widget.setWidget(self.image_sequence_widget)
         self.image_sequence_dock_widget.setMaximumHeight(300)
         self.image_sequence_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.image_sequence_dock_widget.setStyleSheet(style_sheet.dock_widget_style())
 
-        self.image_viewer_widget = ImageViewerWidget(self.main_console_widget)
+        self.image_viewer_widget = ImageViewerWidget(self.main_console_widget, self.frame_store)
         self.image_viewer_dock_widget = QDockWidget("Image Viewer")
         self.image_viewer_dock_widget.setWidget(self.image_viewer_widget)
         self.image_viewer_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.image_viewer_dock_widget.setStyleSheet(style_sheet.dock_widget_style())
 
-        self.sprite_sheet_widget = SpriteSheetWidget(self.main_console_widget, self.control_widget)
+        self.sprite_sheet_widget = SpriteSheetWidget(self.main_console_widget, self.control_widget, self.frame_store)
         self.sprite_sheet_dock_widget = QDockWidget("Sprite Sheet")
         self.sprite_sheet_dock_widget.setWidget(self.sprite_sheet_widget)
         self.sprite_sheet_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.sprite_sheet_dock_widget.setStyleSheet(style_sheet.dock_widget_style())
 
-        self.playback_widget = PlaybackWidget(self.main_console_widget, self.control_widget, self.statusbar)
+        self.playback_widget = PlaybackWidget(self.main_console_widget, self.control_widget, self.statusbar,
+                                              self.frame_store)
         self.playback_widget_dock_widget = QDockWidget("Playback")
         self.playback_widget_dock_widget.setWidget(self.playback_widget)
         self.playback_widget_dock_widget.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.playback_widget_dock_widget.setStyleSheet(style_sheet.dock_widget_style())
 
+        # Run the imports, exports and scripts as background jobs that report to the status bar.
+        self.job_engine = JobEngine(self.main_console_widget, parent=self)
+        self.job_engine.jobStarted.connect(self.statusbar.job_started)
+        self.job_engine.jobProgress.connect(self.statusbar.job_progress)
+        self.job_engine.jobFinished.connect(self.statusbar.job_ended)
+        self.job_engine.jobFailed.connect(self.statusbar.job_ended)
+        self.job_engine.jobCancelled.connect(self.statusbar.job_ended)
+        self.statusbar.cancelClicked.connect(self.job_engine.cancel)
+
         # Add the import/export and converter functions
-        self.import_export = ImportExporter(self.main_console_widget, self.control_widget,self.statusbar)
+        self.import_export = ImportExporter(self.main_console_widget, self.control_widget, self.statusbar,
+                                            self.frame_store, self.job_engine)
         self.direct_converter = DirectConverter(self.main_console_widget,self.control_widget, self.statusbar)
 
         # Set up the menu bar
@@ -143,6 +160,7 @@ class MainWindow(QMainWindow):
         self.menu_bar.exportmp4file.connect(lambda: self.export_sequence("mp4"))
         self.menu_bar.exportwebmfile.connect(lambda: self.export_sequence("web"))
         self.menu_bar.exitapp.connect(self.exit_application)
+        self.menu_bar.verboseconsole.connect(self.main_console_widget.set_verbose)
 
         # Connect the menu bar signal using instance for scripts menu
         self.menu_bar.lsl_script_1.connect(lambda: self.provide_script("LSL"))
@@ -166,19 +184,20 @@ class MainWindow(QMainWindow):
         # Connect the controls here
         self.control_widget.fpsValueChanged.connect(self.playback_widget.set_fps_value)
         self.control_widget.display_frame_Changed.connect(self.playback_widget.set_frame_number)
-        self.control_widget.start_frame_Value_Changed.connect(self.sprite_sheet_widget.update_sprite_sheet)
-        self.control_widget.end_frame_Value_Changed.connect(self.sprite_sheet_widget.update_sprite_sheet)
+        self.control_widget.start_frame_Value_Changed.connect(self.sprite_sheet_widget.schedule_update)
+        self.control_widget.end_frame_Value_Changed.connect(self.sprite_sheet_widget.schedule_update)
         self.control_widget.use_grid_checkbox.stateChanged.connect(self.sprite_sheet_widget.toggle_grid_overlay)
         self.control_widget.use_index_checkbox.stateChanged.connect(self.sprite_sheet_widget.toggle_index_overlay)
         self.control_widget.use_scale_checkbox.stateChanged.connect(self.sprite_sheet_widget.toggle_use_scale)
         self.control_widget.grid_row_Value_Changed.connect(self.update_playback_display)
         self.control_widget.grid_column_Value_Changed.connect(self.update_playback_display)
-        self.control_widget.image_width_Value_Changed.connect(self.sprite_sheet_widget.update_sprite_sheet)
-        self.control_widget.image_height_Value_Changed.connect(self.sprite_sheet_widget.update_sprite_sheet)
+        self.control_widget.image_width_Value_Changed.connect(self.sprite_sheet_widget.schedule_update)
+        self.control_widget.image_height_Value_Changed.connect(self.sprite_sheet_widget.schedule_update)
         self.control_widget.playClicked.connect(self.playback_widget.start_playback)
         self.control_widget.stopClicked.connect(self.playback_widget.stop_playback)
         self.image_sequence_widget.imageClicked.connect(self.handle_image_clicked)
         self.sprite_sheet_widget.labelClicked.connect(self.copy_to_clipboard)
+        self.sprite_sheet_widget.sheetReady.connect(self.playback_widget.set_sprite_sheet)
         self.image_viewer_widget.imagepathClicked.connect(self.open_file_path)
 
         # add the widgets to the main window.
@@ -232,7 +251,7 @@ class MainWindow(QMainWindow):
         updates the playback and sprite sheet controls.
         """
         try:
-            self.sprite_sheet_widget.update_sprite_sheet()
+            self.sprite_sheet_widget.schedule_update()
             self.playback_widget.display_playtime()
         except Exception as err:
             self.main_console_widget.append_text("ERROR: update_playback_display: {}".format(err.args))
@@ -275,28 +294,32 @@ class MainWindow(QMainWindow):
         """Imports an image sequence and populates the widgets.
 
         This method imports an image sequence using the ImportExporter class.
-        The widgets in the application are then populated with the images.
+        The import runs as a background job, the widgets are populated with the images once it finishes.
         """
-        self.statusbar.progressbar_visibility(True)
-        self.image_sequence = []
-
         if file_type == "seq":
-            self.image_sequence = self.import_export.import_image_sequence()
+            self.import_export.import_image_sequence(self.set_image_sequence)
         elif file_type == "mp4":
-            self.image_sequence = self.import_export.import_as_mp4()
+            self.import_export.import_as_mp4(self.set_image_sequence)
         elif file_type == "gif":
-            self.image_sequence = self.import_export.import_as_gif()
+            self.import_export.import_as_gif(self.set_image_sequence)
         # elif file_type == "web":
-        # self.image_sequence = self.import_export.import_as_webm()
+        # self.import_export.import_as_webm(self.set_image_sequence)
+
+    def set_image_sequence(self, sequence: list) -> None:
+        """Keeps the imported image sequence and populates the widgets with it.
+
+        Args:
+            sequence: (list): The list containing the image sequence.
+        """
+        self.image_sequence = sequence
 
         # Populated list populate widgets.
         if self.image_sequence:
             self.populate_image_sequence(self.image_sequence)
 
     def export_sequence(self, file_type: str) -> None:
-        """Exports the image sequence to a selected format."""
+        """Exports the image sequence to a selected format, the export runs as a background job."""
 
-        self.statusbar.progressbar_visibility(True)
         if file_type == "seq":
             self.import_export.export_image_sequence(self.image_sequence)
         elif file_type == "mp4":
@@ -306,12 +329,10 @@ class MainWindow(QMainWindow):
         elif file_type == "web":
             self.import_export.export_as_webm(self.image_sequence)
         elif file_type == "sprite":
-            sprite_sheet = self.sprite_sheet_widget.get_generated_sprite_sheet()
+            # The overlays are only shown in the widget, the export asks for them to be baked into the pixels.
+            sprite_sheet = self.sprite_sheet_widget.get_generated_sprite_sheet(bake_overlays=True)
             self.import_export.export_sprite_sheet(sprite_sheet)
 
-        self.statusbar.update_progressbar(0)
-        self.statusbar.progressbar_visibility(False)
-
     def convert_type(self, file_type: str) -> None:
         """
         Converts files from one type to another.
@@ -341,8 +362,6 @@ class MainWindow(QMainWindow):
         Args:
             script_type (str): The type of script to provide to the user.
         """
-        self.statusbar.progressbar_visibility(True)
-
         scripts = ScriptGenerator()
         if script_type == "LSL":
             self.import_export.save_script(script_type, scripts.generate_lsl_script_option_1())
@@ -355,9 +374,6 @@ class MainWindow(QMainWindow):
         elif script_type == "PyGame":
             self.import_export.save_script(script_type, scripts.generate_pygame_script())
 
-        self.statusbar.update_progressbar(0)
-        self.statusbar.progressbar_visibility(False)
-
     def populate_image_sequence(self, sequence) -> None:
         """
         Populates all the widgets with the image sequence.
@@ -368,15 +384,19 @@ class MainWindow(QMainWindow):
         try:
             if sequence:
 
-                self.statusbar.progressbar_visibility(True)
                 self.statusbar.set_total_frame_text(str(len(sequence)))
+
+                # Nothing is decoded up front, the widgets are filled from the paths and decode the frames they
+                # show through the store in the background.
+                self.frame_store.set_sequence(sequence)
+                # The thumbnail strip creates its thumbnails in the background, so it is filled first.
                 self.image_sequence_widget.load_sequence(sequence)
                 self.image_viewer_widget.load_image(sequence, 0)
                 self.playback_widget.load_image_sequence(sequence)
                 self.sprite_sheet_widget.load_images(sequence)
 
-                self.statusbar.update_progressbar(0)
-                self.statusbar.progressbar_visibility(False)
+                # Keep showing the progress of any jobs that are still running.
+                self.statusbar.show_jobs()
             else:
                 self.main_console_widget.append_text("WARNING: populate_image_sequence: Nothing selected.")
         except Exception as err:
@@ -430,8 +450,16 @@ class MainWindow(QMainWindow):
         Exit the application gracefully.
         This method is called when the application is exiting.
         """
+        # Stop the background jobs before their temp files are removed.
+        self.job_engine.shutdown()
+        self.playback_widget.stop_playback()
+        self.playback_widget.playback_buffer.shutdown()
+        self.image_sequence_widget.shutdown()
+        self.sprite_sheet_widget.shutdown()
         # Remove the temp directory for this tool.
         self.import_export.clean_up_temp_directory()
+        # Write the remaining messages to the log file.
+        self.main_console_widget.close_log()
         # End this process
         self.close()
 
@@ -17,6 +17,7 @@ class MenuBar(QMenuBar):
         exportmp4file: Signal emitted when "Export MP4 File" action is triggered.
         convertmp4tosequence: Signal emitted when "Convert MP4 to Sequence" action is triggered.
         exitapp: Signal emitted when "Exit" action is triggered.
+        verboseconsole: Signal emitted with the checked state when "Show Per Frame Messages" is toggled.
 
     Args:
         main_console_widget: The main console widget.
@@ -31,6 +32,7 @@ class MenuBar(QMenuBar):
         export_mp4_file_action: QAction for "Export MP4 File" action.
         convert_mp4_to_sequence_action: QAction for "Convert MP4 to Sequence" action.
         exit_action: QAction for "Exit" action.
+        verbose_console_action: Checkable QAction for "Show Per Frame Messages" action.
     """
     lsl_script_1 = pyqtSignal()
     lsl_script_2 = pyqtSignal()
@@ -52,6 +54,7 @@ class MenuBar(QMenuBar):
     exportmp4file = pyqtSignal()
     exportwebmfile = pyqtSignal()
     exitapp = pyqtSignal()
+    verboseconsole = pyqtSignal(bool)
 
     def __init__(self, main_console_widget):
         """
@@ -63,6 +66,7 @@ class MenuBar(QMenuBar):
         super().__init__()
 
         self.convert_menu = None
+        self.view_menu = None
         self.script_menu = None
         self.file_menu = None
         self.menubar = None
@@ -78,6 +82,7 @@ class MenuBar(QMenuBar):
         self.lsl_script_2_action = None
         self.lsl_script_1_action = None
         self.exit_action = None
+        self.verbose_console_action = None
         self.export_mp4_file_action = None
         self.import_mp4_file_action = None
         self.export_webm_file_action = None
@@ -107,6 +112,7 @@ class MenuBar(QMenuBar):
         # Create the menu bar options.
         self.file_menu = self.menubar.addMenu("File")
         self.script_menu = self.menubar.addMenu("Scripts")
+        self.view_menu = self.menubar.addMenu("View")
         # self.convert_menu = self.menubar.addMenu("Converters")
 
         # Create the file menu items.
@@ -120,6 +126,10 @@ class MenuBar(QMenuBar):
         self.export_mp4_file_action = QAction("Export MP4 File", self.menubar)
         self.exit_action = QAction("Exit", self.menubar)
 
+        # Create the view menu items.
+        self.verbose_console_action = QAction("Show Per Frame Messages", self.menubar)
+        self.verbose_console_action.setCheckable(True)
+
         # Create the script menu items.
         self.lsl_script_1_action = QAction("Save Single LSL Script", self.menubar)
         self.lsl_script_2_action = QAction("Save Seq. LSL Script", self.menubar)
@@ -145,6 +155,7 @@ class MenuBar(QMenuBar):
         self.import_mp4_file_action.triggered.connect(self.emit_import_mp4_file)
         self.export_mp4_file_action.triggered.connect(self.emit_export_mp4_file)
         self.exit_action.triggered.connect(self.emit_exit_application)
+        self.verbose_console_action.toggled.connect(self.emit_verbose_console)
 
         # connect the script options.
         self.lsl_script_1_action.triggered.connect(self.emit_lsl_script_1)
@@ -184,6 +195,9 @@ class MenuBar(QMenuBar):
         self.script_menu.addAction(self.godot_script_action)
         self.script_menu.addAction(self.pygame_script_action)
 
+        # Add the view actions to the menu
+        self.view_menu.addAction(self.verbose_console_action)
+
         # Add the convert actions to the menu
         # self.convert_menu.addAction(self.image_convert_action)
         # self.convert_menu.addAction(self.seq_convert_action)
@@ -195,6 +209,7 @@ class MenuBar(QMenuBar):
         # Apply the style settings to each of the menus
         self.file_menu.setStyleSheet(style_sheet.menu_bar_style())
         self.script_menu.setStyleSheet(style_sheet.menu_bar_style())
+        self.view_menu.setStyleSheet(style_sheet.menu_bar_style())
         # self.convert_menu.setStyleSheet(style_sheet.menu_bar_style())
 
         return self.menubar
@@ -318,3 +333,12 @@ class MenuBar(QMenuBar):
         Emit the exitapp signal.
         """
         self.exitapp.emit()
+
+    def emit_verbose_console(self, checked: bool) -> None:
+        """
+        Emit the verboseconsole signal.
+
+        Args:
+            checked (bool): Show the per frame messages in the console.
+        """
+        self.verboseconsole.emit(checked)
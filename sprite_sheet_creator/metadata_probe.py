@@ -0,0 +1,90 @@
+import threading
+
+from PyQt5.QtCore import Qt, QFileInfo
+from PyQt5.QtGui import QImage, QImageReader
+
+
+class MetadataProbe:
+    """
+    Reads the file and image information of a frame without decoding its pixels.
+
+    QImageReader only parses the file header (the PNG IHDR chunk, the JPEG SOF marker and so on) to get the
+    size and pixel format, which takes microseconds instead of a full decode. The results are cached by path,
+    modification time and file size, so a file that changed on disk is probed again.
+    """
+
+    def __init__(self):
+        """
+        Initialize the MetadataProbe.
+        """
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get_metadata(self, file_path: str, key: tuple) -> dict:
+        """
+        Gets the metadata of a file, probing the header if the file is not cached yet.
+
+        Args:
+            file_path (str): The path of the image file.
+            key (tuple): The path, modification time and size of the file.
+
+        Returns:
+            dict: The creation time, name, path, size, width, height and bit depth of the image.
+        """
+        with self.lock:
+            entry = self.entries.get(file_path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        metadata = self.probe(file_path)
+        with self.lock:
+            self.entries[file_path] = (key, metadata)
+        return metadata
+
+    def probe(self, file_path: str) -> dict:
+        """
+        Reads the metadata from the file header.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            dict: The metadata of the image, the image values are 0 if the header can not be read.
+        """
+        reader = QImageReader(file_path)
+        size = reader.size()
+        image_format = reader.imageFormat()
+
+        # Some formats only know their pixel format after decoding, fall back to 0 like a null image.
+        depth = 0
+        if image_format != QImage.Format_Invalid:
+            depth = QImage.toPixelFormat(image_format).bitsPerPixel()
+
+        file_info = QFileInfo(file_path)
+        return {
+            "creation_time": file_info.created().toString(Qt.ISODate),
+            "file_name": file_info.fileName(),
+            "file_path": file_info.filePath(),
+            "file_size": file_info.size(),
+            "width": max(size.width(), 0),
+            "height": max(size.height(), 0),
+            "depth": depth,
+        }
+
+    def discard(self, file_paths) -> None:
+        """
+        Removes files from the cache.
+
+        Args:
+            file_paths: The paths of the files to remove.
+        """
+        with self.lock:
+            for file_path in file_paths:
+                self.entries.pop(file_path, None)
+
+    def clear(self) -> None:
+        """
+        Removes all the files from the cache.
+        """
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QObject, QSize, pyqtSignal
+
+
+class PlaybackBuffer(QObject):
+    """
+    Keeps a bounded window of decoded frames around the play head.
+
+    The frames ahead of the play head are decoded on a worker thread in playback order, wrapping around the
+    playback range, and the frames that fall behind the window are dropped. Memory scales with the capacity
+    of the buffer instead of the length of the sequence.
+
+    A frame that is not decoded yet is reported as missing instead of decoding it on the GUI thread, so the
+    playback keeps running while the worker catches up.
+
+    When a target size is set, the worker also resamples the frames larger than it down to that size, so the
+    buffer holds frames at the resolution of the view instead of the source resolution.
+    """
+
+    # The sequence generation, the frame index and the decoded QImage, sent from the worker thread.
+    frameDecoded = pyqtSignal(int, int, object)
+    # The index of a frame that was added to the buffer.
+    frameBuffered = pyqtSignal(int)
+
+    def __init__(self, frame_store, main_console_widget, capacity: int = 24, max_workers: int = 2, parent=None):
+        """
+        Initialize the PlaybackBuffer.
+
+        Args:
+            frame_store (FrameStore): The store the frames are decoded from.
+            main_console_widget (QWidget): The console widget for displaying messages.
+            capacity (int): The number of frames kept in the buffer.
+            max_workers (int): The number of decode threads.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.frame_store = frame_store
+        self.console = main_console_widget
+        self.capacity = max(1, capacity)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Playback")
+
+        self.image_sequence = []
+        self.generation = 0
+        self.target_size = QSize()
+
+        # The decoded frames by index, only used on the GUI thread.
+        self.frames = {}
+
+        # The indexes in the window and the ones queued for decoding, shared with the worker threads.
+        self.window = set()
+        self.requested = set()
+        self.lock = threading.Lock()
+
+        self.frameDecoded.connect(self.store_frame)
+
+    def set_sequence(self, image_sequence: list) -> None:
+        """
+        Replaces the sequence, dropping the buffered frames and the ones still queued for the previous one.
+
+        Args:
+            image_sequence (list): A list of image paths for the sequence.
+        """
+        with self.lock:
+            self.generation += 1
+            self.image_sequence = list(image_sequence)
+            self.window = set()
+            self.requested = set()
+        self.frames = {}
+
+    def set_target_size(self, target_size: QSize) -> bool:
+        """
+        Sets the size the frames are resampled to, dropping the frames buffered at the previous size.
+
+        The frames are resampled again as the play head reaches them.
+
+        Args:
+            target_size (QSize): The size of the view in device pixels, an empty size keeps the source size.
+
+        Returns:
+            bool: True if the size changed.
+        """
+        if target_size == self.target_size:
+            return False
+
+        with self.lock:
+            self.generation += 1
+            self.target_size = QSize(target_size)
+            self.window = set()
+            self.requested = set()
+        self.frames = {}
+        return True
+
+    def get_window(self, index: int, start: int, end: int) -> list:
+        """
+        Gets the indexes the buffer should hold, starting at the play head and wrapping around the range.
+
+        Args:
+            index (int): The index of the play head.
+            start (int): The first frame of the playback range.
+            end (int): The frame after the last frame of the playback range.
+
+        Returns:
+            list: The frame indexes in playback order.
+        """
+        # A play head outside the range, for example while scrubbing, buffers around it in the whole sequence.
+        if not start <= index < end:
+            start, end = 0, len(self.image_sequence)
+        length = end - start
+        if length <= 0:
+            return []
+        return [start + (index - start + offset) % length for offset in range(min(self.capacity, length))]
+
+    def seek(self, index: int, start: int, end: int) -> None:
+        """
+        Moves the play head, evicting the frames behind it and queueing the missing frames ahead of it.
+
+        Args:
+            index (int): The index of the play head.
+            start (int): The first frame of the playback range.
+            end (int): The frame after the last frame of the playback range.
+        """
+        window = self.get_window(index, start, end)
+
+        with self.lock:
+            self.window = set(window)
+            generation = self.generation
+            missing = [frame_index for frame_index in window
+                       if frame_index not in self.frames and frame_index not in self.requested]
+            self.requested.update(missing)
+
+        for frame_index in list(self.frames):
+            if frame_index not in self.window:
+                del self.frames[frame_index]
+
+        # The executor runs the tasks in order, so the frames closest to the play head are decoded first.
+        for frame_index in missing:
+            self.executor.submit(self.decode, generation, frame_index)
+
+    def get(self, index: int, start: int, end: int):
+        """
+        Gets a buffered frame and moves the play head to it.
+
+        Args:
+            index (int): The index of the frame.
+            start (int): The first frame of the playback range.
+            end (int): The frame after the last frame of the playback range.
+
+        Returns:
+            QImage: The decoded frame, or None if it is not decoded yet.
+        """
+        self.seek(index, start, end)
+        return self.frames.get(index)
+
+    def decode(self, generation: int, index: int) -> None:
+        """
+        Decodes a frame if it is still in the window. Runs on a worker thread.
+
+        Args:
+            generation (int): The sequence the frame was queued for.
+            index (int): The index of the frame.
+        """
+        with self.lock:
+            if generation != self.generation or index not in self.window:
+                # The play head moved on, the frame is queued again if it comes back into the window.
+                self.requested.discard(index)
+                return
+            file_path = self.image_sequence[index]
+            target_size = self.target_size
+
+        try:
+            # The buffer keeps the frame itself, the full resolution image is not added to the shared image cache.
+            image = self.frame_store.get_image(file_path, cache=False)
+            if not target_size.isEmpty() and (image.width() > target_size.width() or image.height() > target_size.height()):
+                image = image.scaled(target_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        except Exception as err:
+            # Forget the request, so the frame is queued again the next time the play head reaches it.
+            with self.lock:
+                self.requested.discard(index)
+            self.console.append_text("ERROR: decode: {}".format(err.args))
+            return
+
+        self.frameDecoded.emit(generation, index, image)
+
+    def store_frame(self, generation: int, index: int, image) -> None:
+        """
+        Adds a decoded frame to the buffer. Runs on the GUI thread.
+
+        Args:
+            generation (int): The sequence the frame was decoded for.
+            index (int): The index of the frame.
+            image (QImage): The decoded frame.
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.requested.discard(index)
+            if index not in self.window:
+                return
+
+        self.frames[index] = image
+        self.frameBuffered.emit(index)
+
+    def shutdown(self) -> None:
+        """
+        Drops the queued frames and waits for the worker threads to stop.
+        """
+        self.set_sequence([])
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,128 @@
+import time
+
+
+class PlaybackClock:
+    """
+    Works out which frame should be on screen from a monotonic clock.
+
+    The frame position is computed from the time since playback started instead of counting timer ticks, so
+    rounding the timer interval to whole milliseconds or a stalled event loop does not slow the animation.
+    When the playback falls behind, the frames it missed are skipped and counted as dropped.
+
+    The clock also measures the frame rate actually shown and the frames that were dropped or shown late.
+    """
+
+    def __init__(self, fps: float = 24.0):
+        """
+        Initialize the PlaybackClock.
+
+        Args:
+            fps (float): The number of frames per second.
+        """
+        self.fps = fps
+        self.start_time = 0.0
+        self.position = -1
+        self.lateness = 0.0
+
+        self.shown_frames = 0
+        self.dropped_frames = 0
+        self.late_frames = 0
+
+        # The frames shown since the actual frame rate was last measured.
+        self.sample_time = 0.0
+        self.sample_frames = 0
+
+    def start(self) -> None:
+        """
+        Starts counting from the first frame and resets the statistics.
+        """
+        self.start_time = time.perf_counter()
+        self.position = -1
+        self.lateness = 0.0
+        self.shown_frames = 0
+        self.dropped_frames = 0
+        self.late_frames = 0
+        self.sample_time = self.start_time
+        self.sample_frames = 0
+
+    def set_fps(self, fps: float) -> None:
+        """
+        Changes the frame rate, keeping the current frame position.
+
+        Args:
+            fps (float): The number of frames per second.
+        """
+        if fps and fps != self.fps:
+            self.start_time = time.perf_counter() - max(self.position, 0) / fps
+            self.fps = fps
+
+    def get_frame_time(self, position: int) -> float:
+        """
+        Gets the time at which a frame is due.
+
+        Args:
+            position (int): The number of frames since the start.
+
+        Returns:
+            float: The time in seconds, on the clock of time.perf_counter.
+        """
+        return self.start_time + position / self.fps
+
+    def advance(self) -> int:
+        """
+        Moves to the frame that is due now.
+
+        Returns:
+            int: The number of frames to move the play head, 0 when the current frame is still due.
+                Every frame after the first one was missed and is counted as dropped.
+        """
+        now = time.perf_counter()
+        target = int((now - self.start_time) * self.fps)
+        step = target - self.position
+        if step <= 0:
+            return 0
+
+        self.dropped_frames += step - 1
+        self.lateness = now - self.get_frame_time(target)
+        self.position = target
+        return step
+
+    def record_frame(self, shown: bool) -> None:
+        """
+        Records whether the frame returned by advance made it to the screen.
+
+        Args:
+            shown (bool): False when the frame was not ready and was skipped.
+        """
+        if not shown:
+            self.dropped_frames += 1
+            return
+
+        self.shown_frames += 1
+        self.sample_frames += 1
+        # A frame shown more than half a frame after it was due is visibly late.
+        if self.lateness > 0.5 / self.fps:
+            self.late_frames += 1
+
+    def get_time_to_next_frame(self) -> float:
+        """
+        Gets the time left until the next frame is due.
+
+        Returns:
+            float: The time in seconds, 0 if the next frame is already due.
+        """
+        return max(0.0, self.get_frame_time(self.position + 1) - time.perf_counter())
+
+    def get_actual_fps(self) -> float:
+        """
+        Measures the frame rate shown since the last measurement.
+
+        Returns:
+            float: The number of frames shown per second.
+        """
+        now = time.perf_counter()
+        elapsed = now - self.sample_time
+        actual_fps = self.sample_frames / elapsed if elapsed > 0 else 0.0
+        self.sample_time = now
+        self.sample_frames = 0
+        return actual_fps
@@ -1,14 +1,59 @@
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QImage, QPixmap, QTransform
-from PyQt5.QtWidgets import QLabel, QWidget, QVBoxLayout, QScrollArea, QScrollBar, QGraphicsView, QGraphicsScene
+from PyQt5.QtCore import Qt, QTimer, QRect, QRectF
+from PyQt5.QtGui import QPixmap, QTransform, QImage
+from PyQt5.QtWidgets import QLabel, QWidget, QVBoxLayout, QScrollArea, QScrollBar, QGraphicsView, QGraphicsScene, \
+    QGraphicsItem, QStyleOptionGraphicsItem, QCheckBox
 import style_sheet
 import datetime
+import math
+from frame_cache import FrameCache
+from playback_buffer import PlaybackBuffer
+from playback_clock import PlaybackClock
 
 
 # TODO: Fit the playback to the widget on scale
 # TODO: Fix the zoom to match the image viewer.
 # TODO: Fix Checker Alpha Background not appearing.
 
+class SpriteSheetCellItem(QGraphicsItem):
+    """Draws a single cell of the sprite sheet straight from the sheet QImage, without copying the cell."""
+
+    def __init__(self):
+        """
+        Initializes the SpriteSheetCellItem.
+        """
+        super().__init__()
+        self.image = QImage()
+        self.source_rect = QRect()
+
+    def set_image(self, image: QImage) -> None:
+        """
+        Sets the sprite sheet the cells are drawn from.
+
+        Args:
+            image: QImage: the sprite sheet, shared with the sprite sheet widget.
+        """
+        self.image = image
+        self.update()
+
+    def set_cell(self, source_rect: QRect) -> None:
+        """
+        Sets the cell that is drawn.
+
+        Args:
+            source_rect: QRect: the area of the cell on the sprite sheet.
+        """
+        if source_rect.size() != self.source_rect.size():
+            self.prepareGeometryChange()
+        self.source_rect = source_rect
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(0, 0, self.source_rect.width(), self.source_rect.height())
+
+    def paint(self, painter, option: QStyleOptionGraphicsItem, widget=None) -> None:
+        painter.drawImage(self.boundingRect(), self.image, QRectF(self.source_rect))
+
+
 class PlaybackWidget(QWidget):
     """
     A widget for playing back an image sequence.
@@ -17,10 +62,11 @@ class PlaybackWidget(QWidget):
         main_console_widget (QWidget): The main console widget.
         control_widget (QWidget): The control widget.
         status_bar (QWidget): The status bar widget.
+        frame_store (FrameStore): The store holding the decoded frames.
         parent (QWidget, optional): The parent widget. Defaults to None.
     """
 
-    def __init__(self, main_console_widget, control_widget, status_bar, parent=None):
+    def __init__(self, main_console_widget, control_widget, status_bar, frame_store, parent=None):
         """
         Initializes the PlaybackWidget.
 
@@ -28,13 +74,19 @@ class PlaybackWidget(QWidget):
             main_console_widget (QWidget): The main console widget.
             control_widget (QWidget): The control widget.
             status_bar (QWidget): The status bar widget.
+            frame_store (FrameStore): The store holding the decoded frames.
             parent (QWidget, optional): The parent widget. Defaults to None.
         """
         super(PlaybackWidget, self).__init__(parent)
+        self.frame_store = frame_store
         self.Playtime_label = None
+        self.stats_label = None
         self.label = None
         self.scene = None
         self.view = None
+        self.pixmap_item = None
+        self.sheet_item = None
+        self.sheet_checkbox = None
         self.console = main_console_widget
         self.is_playing = False
         self.status = status_bar
@@ -42,12 +94,36 @@ class PlaybackWidget(QWidget):
 
         self.image_sequence = []
         self.current_frame = 0
+        self.display_index = None
+        self.shown_index = None
+
+        # Only the frames around the play head are kept decoded.
+        self.playback_buffer = PlaybackBuffer(frame_store, self.console, parent=self)
+        self.playback_buffer.frameBuffered.connect(self.handle_frame_buffered)
+
+        # The frames already converted for display by index, so a looping playback converts each frame once.
+        self.pixmap_cache = FrameCache(256 * 1024 ** 2)
+
+        # The generated sprite sheet, the area of each of its cells and the frame shown in the first cell.
+        self.sheet_mode = False
+        self.sheet_cells = []
+        self.sheet_first_index = 0
+
         self.zoom_factor = 1.0
         self.zoom_origin = None
         self.drag_origin = None
         self.dragging = False
+
+        # The timer is started again for each frame, at the time the playback clock says it is due.
+        self.playback_clock = PlaybackClock()
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_frame)
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.display_stats)
         self.setup_ui()
 
         self.control = control_widget
@@ -70,6 +146,11 @@ class PlaybackWidget(QWidget):
             self.view = QGraphicsView(self)
             self.scene = QGraphicsScene(self)
             self.view.setScene(self.scene)
+            # The frames are swapped into a single item instead of rebuilding the scene on every frame.
+            self.pixmap_item = self.scene.addPixmap(QPixmap())
+            self.sheet_item = SpriteSheetCellItem()
+            self.sheet_item.setVisible(False)
+            self.scene.addItem(self.sheet_item)
             self.view.setStyleSheet(style_sheet.graphics_View_style())
             layout.addWidget(self.view)
 
@@ -85,6 +166,17 @@ class PlaybackWidget(QWidget):
             self.Playtime_label.setToolTip("Sprite sheet animation length: Duration = cells/fps")
             layout.addWidget(self.Playtime_label)
 
+            self.stats_label = QLabel("Playback:", self)
+            self.stats_label.setStyleSheet(style_sheet.folder_path_label_style())
+            self.stats_label.setToolTip("The frame rate actually shown, and the frames dropped or shown late")
+            layout.addWidget(self.stats_label)
+
+            self.sheet_checkbox = QCheckBox("Play Sprite Sheet", self)
+            self.sheet_checkbox.setStyleSheet(style_sheet.checkbox_style())
+            self.sheet_checkbox.setToolTip("Play the cells of the generated sprite sheet instead of the source frames")
+            self.sheet_checkbox.stateChanged.connect(self.set_sheet_mode)
+            layout.addWidget(self.sheet_checkbox)
+
         except Exception as err:
             self.console.append_text("ERROR: setup_ui: {}".format(err.args))
 
@@ -92,15 +184,19 @@ class PlaybackWidget(QWidget):
         """
         Loads an image sequence.
 
+        The frames are not decoded here, the playback buffer decodes them ahead of the play head.
+
         Args:
             image_sequence_list (list): A list of image file paths.
         """
         try:
-            self.image_sequence = []
+            self.image_sequence = list(image_sequence_list or [])
+            self.current_frame = 0
+            self.display_index = None
+            self.shown_index = None
+            self.playback_buffer.set_sequence(self.image_sequence)
+            self.pixmap_cache.clear()
             if image_sequence_list:
-                for file_path in image_sequence_list:
-                    self.console.append_text("INFO: Playback Widget: Loading Image: {}".format(file_path))
-                    self.image_sequence.append(QImage(file_path))
                 # start the playback after the image sequence is done loading.
                 self.start_playback()
                 self.display_playtime()
@@ -113,7 +209,7 @@ class PlaybackWidget(QWidget):
         Fits the image to the size of the widget.
         """
         try:
-            self.view.fitInView(self.scene.itemsBoundingRect(), Qt.KeepAspectRatio)
+            self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
         except Exception as err:
             self.console.append_text("ERROR: fit_to_widget: {}".format(err.args))
 
@@ -122,11 +218,12 @@ class PlaybackWidget(QWidget):
         Starts the playback of the image sequence.
         """
         try:
-            if self.image_sequence:
-
-                playback_speed = 1000 / self.control.get_fps_value()
-
-                self.timer.start(int(playback_speed))  # 30 frames per second
+            fps = self.control.get_fps_value()
+            if self.image_sequence and fps:
+                self.playback_clock.fps = fps
+                self.playback_clock.start()
+                self.timer.start(0)
+                self.stats_timer.start()
                 self.is_playing = True
                 self.console.append_text("INFO: Playback Started.")
                 self.status.set_status_text("Playing Sequence.")
@@ -138,6 +235,11 @@ class PlaybackWidget(QWidget):
         Stops the playback of the image sequence.
         """
         self.timer.stop()
+        self.stats_timer.stop()
+        if self.is_playing:
+            self.console.append_text("INFO: Playback: {} frames shown, {} dropped, {} late.".format(
+                self.playback_clock.shown_frames, self.playback_clock.dropped_frames,
+                self.playback_clock.late_frames))
         self.is_playing = False
         self.display_playtime()
         self.console.append_text("INFO: Playback Stopped.")
@@ -149,26 +251,195 @@ class PlaybackWidget(QWidget):
         Args:
             value: (str): The integer value to apply to the playback fps.
         """
-        self.stop_playback()
         self.console.append_text("INFO: FPS set to: {}".format(value))
-        self.display_playtime()
-        if value:
-            self.timer.setInterval(1000 / value)
+        if not value:
+            self.stop_playback()
+        elif self.is_playing:
+            # Keep playing from the current frame at the new rate, the statistics carry on.
+            self.playback_clock.set_fps(value)
+            self.timer.start(0)
+        else:
             self.start_playback()
+        self.display_playtime()
+
+    def get_play_range(self) -> tuple:
+        """
+        Gets the frames played between the start and end frame controls.
+
+        Returns:
+            tuple: The first frame and the frame after the last frame.
+        """
+        if self.sheet_mode:
+            return self.sheet_first_index, self.sheet_first_index + len(self.sheet_cells)
+        start = self.control.get_start_frame_value()
+        end = min(self.control.get_end_frame_value(), len(self.image_sequence))
+        return start, end
+
+    def set_sheet_mode(self, sheet_mode: bool) -> None:
+        """
+        Switches between playing the source frames and the cells of the generated sprite sheet.
+
+        Args:
+            sheet_mode (bool): Play the sprite sheet cells.
+        """
+        try:
+            self.sheet_mode = bool(sheet_mode)
+            self.pixmap_item.setVisible(not self.sheet_mode)
+            self.sheet_item.setVisible(self.sheet_mode)
+
+            if self.sheet_mode:
+                # The cells are drawn from the sheet, the decoded source frames are no longer needed.
+                self.playback_buffer.set_sequence(self.image_sequence)
+                self.pixmap_cache.clear()
+                self.display_index = None
+
+            self.console.append_text("INFO: Play Sprite Sheet set to: {}".format(self.sheet_mode))
+            self.refresh_frame()
+            self.fit_to_widget()
+        except Exception as err:
+            self.console.append_text("ERROR: set_sheet_mode: {}".format(err.args))
+
+    def set_sprite_sheet(self, sprite_sheet: QImage, cell_rects: list, first_index: int) -> None:
+        """
+        Sets the generated sprite sheet played in sprite sheet mode.
+
+        Args:
+            sprite_sheet (QImage): The generated sprite sheet, shared with the sprite sheet widget.
+            cell_rects (list): The QRect of each used cell, in frame order.
+            first_index (int): The frame shown in the first cell.
+        """
+        try:
+            self.sheet_item.set_image(sprite_sheet)
+            self.sheet_cells = cell_rects
+            self.sheet_first_index = first_index
+            if self.sheet_mode and not self.is_playing:
+                self.refresh_frame()
+        except Exception as err:
+            self.console.append_text("ERROR: set_sprite_sheet: {}".format(err.args))
+
+    def convert_frame(self, index: int, image) -> QPixmap:
+        """
+        Converts a frame for display and keeps the result in the pixmap cache.
+
+        Args:
+            index (int): The index of the frame.
+            image (QImage): The decoded frame.
+
+        Returns:
+            QPixmap: The converted frame.
+        """
+        pixmap = QPixmap.fromImage(image)
+        self.pixmap_cache.put(index, pixmap, pixmap.width() * pixmap.height() * 4)
+        return pixmap
+
+    def get_pixmap(self, index: int):
+        """
+        Gets a frame ready for display and moves the play head of the playback buffer to it.
+
+        Args:
+            index (int): The index of the frame.
+
+        Returns:
+            QPixmap: The frame, or None if it is not decoded yet.
+        """
+        image = self.playback_buffer.get(index, *self.get_play_range())
+        pixmap = self.pixmap_cache.get(index)
+        if pixmap is None and image is not None:
+            pixmap = self.convert_frame(index, image)
+        return pixmap
+
+    def show_frame(self, pixmap: QPixmap) -> None:
+        """
+        Shows a frame in the view.
+
+        Args:
+            pixmap (QPixmap): The frame to show.
+        """
+        self.pixmap_item.setPixmap(pixmap)
+        self.set_scene_rect(QRectF(pixmap.rect()))
+
+    def set_scene_rect(self, rect: QRectF) -> None:
+        """
+        Sizes the scene to the frame that is shown.
+
+        Args:
+            rect (QRectF): The area of the frame.
+        """
+        if self.scene.sceneRect() != rect:
+            self.scene.setSceneRect(rect)
+            # The frames are resampled to the view, so a new frame size needs a new fit.
+            self.fit_to_widget()
+
+    def present_frame(self, index: int) -> bool:
+        """
+        Shows a frame of the source sequence, or its cell of the sprite sheet in sprite sheet mode.
+
+        Args:
+            index (int): The index of the frame.
+
+        Returns:
+            bool: False if the frame is not ready to be shown yet.
+        """
+        if self.sheet_mode:
+            cell = index - self.sheet_first_index
+            if not 0 <= cell < len(self.sheet_cells):
+                return False
+            self.sheet_item.set_cell(self.sheet_cells[cell])
+            self.set_scene_rect(self.sheet_item.boundingRect())
+        else:
+            pixmap = self.get_pixmap(index)
+            if pixmap is None:
+                return False
+            self.show_frame(pixmap)
+
+        self.shown_index = index
+        return True
+
+    def refresh_frame(self) -> None:
+        """
+        Shows the frame on screen again, after the way the frames are shown changed.
+        """
+        if self.is_playing or self.shown_index is None:
+            return
+        if self.present_frame(self.shown_index) or self.sheet_mode:
+            self.display_index = None
+        else:
+            # Shown by handle_frame_buffered once it is decoded.
+            self.display_index = self.shown_index
+
+    def handle_frame_buffered(self, index: int) -> None:
+        """
+        Converts a frame once the buffer decoded it, ahead of the tick that shows it.
+
+        Shows the frame picked with the frame number control when it was waiting for it.
+
+        Args:
+            index (int): The index of the frame that was buffered.
+        """
+        try:
+            pixmap = self.pixmap_cache.get(index)
+            if pixmap is None:
+                pixmap = self.convert_frame(index, self.playback_buffer.frames[index])
+
+            if not self.is_playing and not self.sheet_mode and index == self.display_index:
+                self.display_index = None
+                self.show_frame(pixmap)
+        except Exception as err:
+            self.console.append_text("ERROR: handle_frame_buffered: {}".format(err.args))
 
     def set_frame_number(self):
         """
         Sets the current frame number.
         """
         try:
-            if not self.is_playing:
-                if self.current_frame >= len(self.image_sequence):
-                    self.current_frame = len(self.image_sequence) - 1
-
-                image = self.image_sequence[self.control.get_display_value()]
-                pixmap = QPixmap.fromImage(image)
-                self.scene.clear()
-                self.scene.addPixmap(pixmap)
+            if not self.is_playing and self.image_sequence:
+                index = min(self.control.get_display_value(), len(self.image_sequence) - 1)
+
+                if self.present_frame(index) or self.sheet_mode:
+                    self.display_index = None
+                else:
+                    # Shown by handle_frame_buffered once it is decoded.
+                    self.display_index = index
                 self.display_playtime()
         except Exception as err:
             self.console.append_text("ERROR: set_frame_number: {}".format(err.args))
@@ -201,22 +472,42 @@ class PlaybackWidget(QWidget):
         except Exception as err:
             self.console.append_text("ERROR: display_playtime: {}".format(err.args))
 
-    def update_frame(self):
+    def display_stats(self) -> None:
         """
-        Updates the current frame.
+        Display the frame rate actually shown and the frames dropped or shown late since playback started.
         """
         try:
-            # if self.current_frame >= len(self.image_sequence):
-            if self.current_frame >= len(self.image_sequence):
-                self.current_frame = self.control.get_start_frame_value()
+            self.stats_label.setText("Playback: {:.1f} fps, {} dropped, {} late".format(
+                self.playback_clock.get_actual_fps(), self.playback_clock.dropped_frames,
+                self.playback_clock.late_frames))
+        except Exception as err:
+            self.console.append_text("ERROR: display_stats: {}".format(err.args))
 
-            if self.current_frame >= self.control.get_end_frame_value():
-                self.current_frame = self.control.get_start_frame_value()
+    def update_frame(self):
+        """
+        Updates the current frame.
 
-            image = self.image_sequence[self.current_frame]
-            pixmap = QPixmap.fromImage(image)
-            self.scene.clear()
-            self.scene.addPixmap(pixmap)
+        The playback clock decides which frame is due, frames that are late by a whole frame or more are skipped
+        so the animation stays on time.
+        """
+        try:
+            step = self.playback_clock.advance()
+            if self.is_playing:
+                self.timer.start(math.ceil(self.playback_clock.get_time_to_next_frame() * 1000))
+            if not step:
+                return
+
+            # Skip the frames that were missed and wrap around the start and end frame controls.
+            self.current_frame += step - 1
+            start, end = self.get_play_range()
+            if self.current_frame >= end:
+                self.current_frame = start + (self.current_frame - end) % (end - start) if end > start else start
+            elif self.current_frame < start and self.sheet_mode:
+                # The cells before the start frame are not on the sheet.
+                self.current_frame = start
+
+            # A frame that is not decoded yet leaves the last frame on screen instead of blocking on a decode.
+            self.playback_clock.record_frame(self.present_frame(self.current_frame))
             self.current_frame += 1
 
             # Update the control.
@@ -365,5 +656,13 @@ class PlaybackWidget(QWidget):
 
         After the window has been resized, this function fits the images to the new widget size.
 
+        The buffered frames are resampled to the new view size as the play head reaches them.
         """
+        try:
+            view_size = self.view.viewport().size() * self.view.devicePixelRatioF()
+            if self.playback_buffer.set_target_size(view_size):
+                self.pixmap_cache.clear()
+                self.refresh_frame()
+        except Exception as err:
+            self.console.append_text("ERROR: report_size: {}".format(err.args))
         self.fit_to_widget()
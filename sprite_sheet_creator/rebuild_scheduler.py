@@ -0,0 +1,51 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class RebuildScheduler(QObject):
+    """
+    Merges bursts of setting changes into a single rebuild.
+
+    Every change restarts a short single shot timer, the rebuild is only requested once the settings stop
+    changing. Typing "2048" into a spin box emits four value changes but rebuilds the sprite sheet once,
+    with the settings the controls hold when the timer fires.
+    """
+
+    rebuildRequested = pyqtSignal()
+
+    def __init__(self, delay: int = 150, parent=None):
+        """
+        Initialize the RebuildScheduler.
+
+        Args:
+            delay (int): The number of milliseconds the settings have to stay unchanged before rebuilding.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(delay)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.rebuildRequested.emit)
+
+    def schedule(self, *args) -> None:
+        """
+        Requests a rebuild, postponing any rebuild that is still waiting.
+
+        Accepts and ignores the arguments of the signal it is connected to.
+        """
+        self.timer.start()
+
+    def cancel(self) -> None:
+        """
+        Drops the waiting rebuild, for example because the caller is rebuilding right away.
+        """
+        self.timer.stop()
+
+    def is_pending(self) -> bool:
+        """
+        Checks if a rebuild is waiting for the settings to settle.
+
+        Returns:
+            bool: True if newer settings have not been rebuilt yet.
+        """
+        return self.timer.isActive()
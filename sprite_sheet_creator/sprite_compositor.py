@@ -0,0 +1,226 @@
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QImage, QPainter, QPen, QPainterPath, QFont
+
+
+class SpriteSheetCompositor:
+    """
+    Composes the sprite sheet cells into a persistent sheet buffer.
+
+    The compositor remembers which frame is painted in each cell, so a rebuild only repaints the cells whose
+    content changed. Moving the end frame by one repaints a single cell instead of the whole sheet.
+
+    The cells are drawn with QPainter. Composing uniform cells as NumPy arrays was measured and was not faster
+    for any grid size, so QPainter is the only path.
+
+    The grid and index overlays are not part of the sheet buffer. They are built as painter paths that can be
+    shown on top of the sheet, and are only painted into the pixels when a baked copy is requested.
+    """
+
+    def __init__(self):
+        """
+        Initialize the SpriteSheetCompositor.
+        """
+        self.sheet = QImage()
+        self.layout = None
+        self.cell_keys = []
+
+    def compose(self, cell_keys: list, get_cell, sheet_width: int, sheet_height: int, rows: int, columns: int) -> list:
+        """
+        Updates the sheet buffer so that it shows the given cells.
+
+        Args:
+            cell_keys (list): A key per cell identifying the scaled frame painted in that cell.
+            get_cell (callable): Called with a cell index, returns the scaled frame as a QImage.
+            sheet_width (int): The width of the sprite sheet.
+            sheet_height (int): The height of the sprite sheet.
+            rows (int): The number of rows in the grid.
+            columns (int): The number of columns in the grid.
+
+        Returns:
+            list: The QRect areas of the sheet that were repainted.
+        """
+        cell_width = sheet_width // columns
+        cell_height = sheet_height // rows
+        layout = (sheet_width, sheet_height, rows, columns)
+
+        # Cells past the end of the grid do not fit on the sheet.
+        cell_keys = list(cell_keys[:rows * columns])
+
+        if self.needs_allocation(sheet_width, sheet_height):
+            # Drop the reference of the compositor before allocating, the sheet is freed once the callers
+            # released their copies as well, see needs_allocation.
+            self.sheet = QImage()
+            self.sheet = QImage(sheet_width, sheet_height, QImage.Format_ARGB32_Premultiplied)
+            self.cell_keys = []
+            self.layout = None
+
+        full_repaint = layout != self.layout
+
+        if full_repaint:
+            self.sheet.fill(Qt.transparent)
+            dirty_cells = list(range(len(cell_keys)))
+            cleared_cells = []
+        else:
+            dirty_cells = [index for index, key in enumerate(cell_keys)
+                           if index >= len(self.cell_keys) or self.cell_keys[index] != key]
+            cleared_cells = list(range(len(cell_keys), len(self.cell_keys)))
+
+        self.layout = layout
+        self.cell_keys = cell_keys
+
+        cells = [get_cell(index) for index in dirty_cells]
+
+        painter = QPainter(self.sheet)
+
+        # Clear the cells that are repainted or no longer used, a full repaint already cleared the whole sheet.
+        if not full_repaint:
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            for index in dirty_cells + cleared_cells:
+                painter.fillRect(self.cell_rect(index, columns, cell_width, cell_height), Qt.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        for index, scaled_image in zip(dirty_cells, cells):
+            cell_rect = self.cell_rect(index, columns, cell_width, cell_height)
+
+            # Calculate the offset to center the images within each cell.
+            offset_x = (cell_width - scaled_image.width()) // 2
+            offset_y = (cell_height - scaled_image.height()) // 2
+            painter.drawImage(cell_rect.x() + offset_x, cell_rect.y() + offset_y, scaled_image)
+
+        painter.end()
+
+        if full_repaint:
+            return [self.sheet.rect()]
+        return [self.cell_rect(index, columns, cell_width, cell_height) for index in dirty_cells + cleared_cells]
+
+    def needs_allocation(self, sheet_width: int, sheet_height: int) -> bool:
+        """
+        Checks if the next compose allocates a new sheet buffer.
+
+        The sheet is implicitly shared with the images handed out by the compositor. Callers holding a copy
+        release it before composing a new size, so the old and the new sheet are not alive at the same time.
+
+        Args:
+            sheet_width (int): The width of the sprite sheet.
+            sheet_height (int): The height of the sprite sheet.
+
+        Returns:
+            bool: True if the sheet buffer is reallocated.
+        """
+        return self.sheet.isNull() or self.sheet.width() != sheet_width or self.sheet.height() != sheet_height
+
+    def cell_rect(self, index: int, columns: int, cell_width: int, cell_height: int) -> QRect:
+        """
+        Gets the area of a cell on the sheet.
+
+        Args:
+            index (int): The index of the cell.
+            columns (int): The number of columns in the grid.
+            cell_width (int): The width of a cell.
+            cell_height (int): The height of a cell.
+
+        Returns:
+            QRect: The area of the cell.
+        """
+        return QRect((index % columns) * cell_width, (index // columns) * cell_height, cell_width, cell_height)
+
+    def grid_path(self, cell_count: int, columns: int, cell_width: int, cell_height: int) -> QPainterPath:
+        """
+        Builds the outline around each used cell.
+
+        Args:
+            cell_count (int): The number of used cells.
+            columns (int): The number of columns in the grid.
+            cell_width (int): The width of a cell.
+            cell_height (int): The height of a cell.
+
+        Returns:
+            QPainterPath: The outline of the cells.
+        """
+        path = QPainterPath()
+        for index in range(cell_count):
+            path.addRect(QRectF(self.cell_rect(index, columns, cell_width, cell_height)))
+        return path
+
+    def index_path(self, cell_count: int, columns: int, cell_width: int, cell_height: int,
+                   first_index: int) -> QPainterPath:
+        """
+        Builds the frame number labels of each used cell.
+
+        Args:
+            cell_count (int): The number of used cells.
+            columns (int): The number of columns in the grid.
+            cell_width (int): The width of a cell.
+            cell_height (int): The height of a cell.
+            first_index (int): The labels start after this frame number.
+
+        Returns:
+            QPainterPath: The outline of the label text.
+        """
+        label_font = QFont()
+        label_font.setPointSize(28)
+
+        path = QPainterPath()
+        for index in range(cell_count):
+            cell_rect = self.cell_rect(index, columns, cell_width, cell_height)
+            path.addText(cell_rect.x(), cell_rect.y() + 60, label_font, "{}".format(first_index + index + 1))
+        return path
+
+    def bake_overlays(self, cell_count: int, columns: int, cell_width: int, cell_height: int,
+                      grid_overlay: bool, first_index: int = None) -> QImage:
+        """
+        Gets a copy of the sheet with the overlays painted into the pixels.
+
+        The cells and the overlays are painted into a single target image in one pass. Without overlays the
+        live sheet buffer itself is returned, callers that hand it to another thread must copy it first.
+
+        Args:
+            cell_count (int): The number of used cells.
+            columns (int): The number of columns in the grid.
+            cell_width (int): The width of a cell.
+            cell_height (int): The height of a cell.
+            grid_overlay (bool): Paint an outline around each cell.
+            first_index (int, optional): Paint the frame number on each cell, starting after this number.
+
+        Returns:
+            QImage: The sheet with the overlays.
+        """
+        if not grid_overlay and first_index is None:
+            return self.sheet
+
+        image = QImage(self.sheet.size(), self.sheet.format())
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.drawImage(0, 0, self.sheet)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        self.paint_overlays(painter, cell_count, columns, cell_width, cell_height, grid_overlay, first_index)
+        painter.end()
+        return image
+
+    def paint_overlays(self, painter: QPainter, cell_count: int, columns: int, cell_width: int, cell_height: int,
+                       grid_overlay: bool, first_index: int = None) -> None:
+        """
+        Paints the overlays with an active painter.
+
+        Args:
+            painter (QPainter): The painter of the target image.
+            cell_count (int): The number of used cells.
+            columns (int): The number of columns in the grid.
+            cell_width (int): The width of a cell.
+            cell_height (int): The height of a cell.
+            grid_overlay (bool): Paint an outline around each cell.
+            first_index (int, optional): Paint the frame number on each cell, starting after this number.
+        """
+        if grid_overlay:
+            # Cyan outline with the same line thickness as the overlay shown in the widget.
+            painter.strokePath(self.grid_path(cell_count, columns, cell_width, cell_height), QPen(Qt.cyan, 5))
+        if first_index is not None:
+            painter.fillPath(self.index_path(cell_count, columns, cell_width, cell_height, first_index), Qt.green)
+
+    def clear(self) -> None:
+        """
+        Releases the sheet buffer.
+        """
+        self.sheet = QImage()
+        self.layout = None
+        self.cell_keys = []
@@ -1,33 +1,107 @@
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QPixmap, QPainter, QTransform, QPen
-from PyQt5.QtWidgets import QWidget, QGraphicsView, QGraphicsScene, QVBoxLayout, QScrollArea, QLabel
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QRectF
+from PyQt5.QtGui import QTransform, QImage, QPen, QBrush
+from PyQt5.QtWidgets import QWidget, QGraphicsView, QGraphicsScene, QVBoxLayout, QScrollArea, QLabel, QGraphicsItem, \
+    QStyleOptionGraphicsItem, QGraphicsPathItem
 
 import style_sheet
+from frame_cache import FrameCache
+from rebuild_scheduler import RebuildScheduler
+from sprite_compositor import SpriteSheetCompositor
+
+
+class SpriteSheetItem(QGraphicsItem):
+    """Draws the sprite sheet buffer straight from the QImage, so a rebuild does not convert the whole sheet."""
+
+    def __init__(self):
+        """
+        Initializes the SpriteSheetItem.
+        """
+        super().__init__()
+        self.image = QImage()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def set_image(self, image: QImage, dirty_rects: list) -> None:
+        """
+        Sets the sheet buffer and schedules a repaint of the areas that changed.
+
+        Args:
+            image: QImage: the sprite sheet buffer.
+            dirty_rects: list: the QRect areas of the sheet that changed.
+        """
+        if image.size() != self.image.size():
+            self.prepareGeometryChange()
+            self.image = image
+            self.update()
+        else:
+            self.image = image
+            for rect in dirty_rects:
+                self.update(QRectF(rect))
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(self.image.rect())
+
+    def paint(self, painter, option: QStyleOptionGraphicsItem, widget=None) -> None:
+        # Only the exposed part of the sheet is drawn.
+        exposed_rect = option.exposedRect
+        painter.drawImage(exposed_rect, self.image, exposed_rect)
 
 
 class SpriteSheetWidget(QWidget):
     """Widget for displaying and manipulating sprite sheets."""
 
     labelClicked = pyqtSignal(str)
+    # Emitted from the build thread with the build id once the cells of that build are scaled.
+    cellsReady = pyqtSignal(int)
+    # Emitted with the sheet, the QRect of each used cell and the frame of the first cell after each build.
+    sheetReady = pyqtSignal(object, list, int)
 
-    def __init__(self, main_console_widget, control_widget):
+    def __init__(self, main_console_widget, control_widget, frame_store):
         """
         Initializes the SpriteSheetWidget.
 
         Args:
             main_console_widget: QWidget: the main console widget.
             control_widget: QWidget: the control widget.
+            frame_store: FrameStore: the store holding the decoded frames.
         """
         super().__init__()
 
         self.index_overlay = False
         self.scroll_pos = None
         self.sprite_sheet = None
-        self.images = None
+        self.image_paths = []
         self.grid_overlay = False
         self.use_scale = False
         self.console = main_console_widget
         self.control = control_widget
+        self.frame_store = frame_store
+
+        # Cells that were already scaled to the current cell size, so rebuilds that keep the cell size reuse them.
+        self.transform_mode = Qt.FastTransformation
+        self.cell_cache = FrameCache(512 * 1024 ** 2)
+
+        # Cells are scaled as QImages on a pool of worker threads, the build thread waits for them to finish.
+        self.scale_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.build_pool = ThreadPoolExecutor(max_workers=1)
+        self.build_id = 0
+        self.cellsReady.connect(self.finish_sprite_sheet)
+
+        # Control changes are merged into one rebuild once the values stop changing.
+        self.rebuild_scheduler = RebuildScheduler(parent=self)
+        self.rebuild_scheduler.rebuildRequested.connect(self.update_sprite_sheet)
+
+        # The sheet buffer is kept between builds so only the changed cells are repainted.
+        self.compositor = SpriteSheetCompositor()
+        self.dirty_rects = []
+
+        # The cell count, columns and cell size the overlays are drawn for, and the frame the index starts after.
+        self.overlay_layout = None
+        self.overlay_first_index = 0
+        self.grid_item_layout = None
+        self.index_item_layout = None
 
         self.image_sequence = []
 
@@ -48,6 +122,21 @@ class SpriteSheetWidget(QWidget):
 
         self.scene = QGraphicsScene()
 
+        self.sheet_item = SpriteSheetItem()
+        self.scene.addItem(self.sheet_item)
+
+        # The overlays are drawn on top of the sheet, so toggling them does not rebuild the sheet.
+        self.grid_item = QGraphicsPathItem()
+        self.grid_item.setPen(QPen(Qt.cyan, 5))
+        self.grid_item.setVisible(False)
+        self.scene.addItem(self.grid_item)
+
+        self.index_item = QGraphicsPathItem()
+        self.index_item.setPen(QPen(Qt.NoPen))
+        self.index_item.setBrush(QBrush(Qt.green))
+        self.index_item.setVisible(False)
+        self.scene.addItem(self.index_item)
+
         self.view.setScene(self.scene)
 
         # Create the scroll area
@@ -84,8 +173,6 @@ class SpriteSheetWidget(QWidget):
         Args:
             sequence: str: a list of file paths to the individual images.
         """
-        image_list = []
-
         start_frame = self.control.get_start_frame_value()
         self.control.set_end_frame_value(len(sequence))
 
@@ -93,19 +180,20 @@ class SpriteSheetWidget(QWidget):
 
         try:
             if self.image_sequence:
-                for file_path in self.image_sequence:
-                    image = QPixmap(file_path)
-                    image_list.append(image)
-                self.images = image_list
+                # The frames are read from the frame store cache while the sheet is built.
+                self.image_paths = list(self.image_sequence)
 
-                if self.images:
-                    self.sprite_sheet = self.create_sprite_sheet()
-
-                    # Display the sprite sheet
-                    self.display_sprite_sheet()
+                if self.image_paths:
+                    self.build_sprite_sheet()
         except Exception as err:
             self.console.append_text("ERROR: load_images: {}".format(err.args))
 
+    def schedule_update(self, *args) -> None:
+        """
+        Schedules a sprite sheet update, merging bursts of control changes into a single rebuild.
+        """
+        self.rebuild_scheduler.schedule()
+
     def update_sprite_sheet(self) -> None:
         """
         Updates the sprite sheet based on the current image sequence and settings.
@@ -121,18 +209,11 @@ class SpriteSheetWidget(QWidget):
                 if end >= len(self.image_sequence):
                     self.control.set_end_frame_value(len(self.image_sequence))
 
-                image_list = []
-                for file_path in self.image_sequence[start:end]:
-                    image = QPixmap(file_path)
-                    image_list.append(image)
-                self.images = image_list
-
-                if self.images:
-                    self.sprite_sheet = self.create_sprite_sheet()
+                # The frames are read from the frame store cache rather than from disk.
+                self.image_paths = self.image_sequence[start:end]
 
-                    # Display the sprite sheet
-                    self.display_sprite_sheet()
-                    self.fit_to_widget()
+                if self.image_paths:
+                    self.build_sprite_sheet()
 
         except Exception as err:
             self.console.append_text("ERROR: update_sprite_sheet: {}".format(err.args))
@@ -175,9 +256,9 @@ class SpriteSheetWidget(QWidget):
             image_height = 0
 
             for file_path in file_paths:
-                pixmap = QPixmap(file_path)
-                image_width = max(image_width, pixmap.width())
-                image_height = max(image_height, pixmap.height())
+                metadata = self.frame_store.get_metadata(file_path)
+                image_width = max(image_width, metadata["width"])
+                image_height = max(image_height, metadata["height"])
 
             grid_width = image_width * grid_columns
             grid_height = image_height * grid_rows
@@ -198,7 +279,7 @@ class SpriteSheetWidget(QWidget):
                 self.grid_overlay = True
 
             self.console.append_text("INFO: Grid Overlay set to: {}".format(self.grid_overlay))
-            self.update_sprite_sheet()
+            self.update_overlays()
 
         except Exception as err:
             self.console.append_text("ERROR: toggle_grid_overlay: {}".format(err.args))
@@ -214,7 +295,7 @@ class SpriteSheetWidget(QWidget):
                 self.index_overlay = True
 
             self.console.append_text("INFO: Index Overlay set to: {}".format(self.index_overlay))
-            self.update_sprite_sheet()
+            self.update_overlays()
 
         except Exception as err:
             self.console.append_text("ERROR: toggle_index_overlay: {}".format(err.args))
@@ -236,28 +317,112 @@ class SpriteSheetWidget(QWidget):
         except Exception as err:
             self.console.append_text("ERROR: toggle_grid_overlay: {}".format(err.args))
 
+    def calculate_sheet_size(self) -> tuple:
+        """
+        Calculates the size of the sprite sheet from the current settings.
+
+        Returns:
+            tuple: the sheet width, sheet height, rows and columns.
+        """
+        # Get the scale values of the image.
+        sprite_sheet_width = self.control.get_image_width_value()
+        sprite_sheet_height = self.control.get_image_height_value()
+
+        # Get the rows and columns
+        rows, columns = self.calculate_rows_columns()
+
+        # Use the source image's full scale for each cell rather than downscaling the images to fit the grid.
+        if self.use_scale:
+            sprite_sheet_width, sprite_sheet_height = self.calculate_grid_size(self.image_paths, rows, columns)
+
+        return sprite_sheet_width, sprite_sheet_height, rows, columns
+
+    def build_sprite_sheet(self) -> None:
+        """
+        Builds and displays the sprite sheet.
+
+        Cells that are not in the cell cache yet are scaled on the worker pool, so the window stays responsive
+        while large frames are resampled. The sheet is composed on the GUI thread once all its cells are ready.
+        """
+        try:
+            sprite_sheet_width, sprite_sheet_height, rows, columns = self.calculate_sheet_size()
+            target_width = sprite_sheet_width // columns
+            target_height = sprite_sheet_height // rows
+
+            # This build uses the latest settings, a waiting rebuild would only repeat it.
+            self.rebuild_scheduler.cancel()
+            self.build_id += 1
+
+            missing_paths = [file_path for file_path in self.image_paths[:rows * columns]
+                             if self.get_cell_key(file_path, target_width, target_height) not in self.cell_cache]
+            if not missing_paths:
+                self.finish_sprite_sheet(self.build_id)
+                return
+
+            future = self.build_pool.submit(
+                self.scale_cells, self.build_id, missing_paths, target_width, target_height)
+            future.add_done_callback(lambda _, build_id=self.build_id: self.cellsReady.emit(build_id))
+
+        except Exception as err:
+            self.console.append_text("ERROR: build_sprite_sheet: {}".format(err.args))
+
+    def scale_cells(self, build_id: int, file_paths: list, target_width: int, target_height: int) -> None:
+        """
+        Scales the frames into the cell cache on the worker pool. Runs on the build thread.
+
+        Frames that are not scaled yet when a newer build starts are skipped, the stale build is left unfinished.
+
+        Args:
+            build_id: int: the build the cells are scaled for.
+            file_paths: list: the paths of the frames to scale.
+            target_width: int: the width of the cell.
+            target_height: int: the height of the cell.
+        """
+        def scale_cell(file_path):
+            if build_id == self.build_id:
+                self.get_scaled_cell(file_path, target_width, target_height)
+
+        list(self.scale_pool.map(scale_cell, file_paths))
+
+    def finish_sprite_sheet(self, build_id: int) -> None:
+        """
+        Composes and displays the sprite sheet once the cells of a build are ready.
+
+        Args:
+            build_id: int: the build the cells were scaled for.
+        """
+        try:
+            # A newer build was started or newer settings are waiting while these cells were scaled,
+            # the sheet is finished for the latest settings instead.
+            if build_id != self.build_id or self.rebuild_scheduler.is_pending():
+                return
+
+            self.sprite_sheet = self.create_sprite_sheet()
+
+            # Display the sprite sheet
+            self.display_sprite_sheet()
+            self.fit_to_widget()
+
+            if self.overlay_layout:
+                self.sheetReady.emit(self.sprite_sheet, self.get_cell_rects(), self.overlay_first_index)
+
+        except Exception as err:
+            self.console.append_text("ERROR: finish_sprite_sheet: {}".format(err.args))
+
     def create_sprite_sheet(self):
         """
         Creates the sprite sheet based on the loaded images and settings.
 
+        Only the cells whose frame changed since the last build are repainted into the persistent sheet buffer.
+
         Returns:
-            QPixmap: the sprite sheet image.
+            QImage: the sprite sheet image.
         """
         try:
-            # Get the scale values of the image.
-            sprite_sheet_width = self.control.get_image_width_value()
-            sprite_sheet_height = self.control.get_image_height_value()
-
-            # Get the rows and columns
-            rows, columns = self.calculate_rows_columns()
+            sprite_sheet_width, sprite_sheet_height, rows, columns = self.calculate_sheet_size()
 
-            # Use the source image's full scale for each cell rather than downscaling the images to fit the grid.
+            # append this info to the console.
             if self.use_scale:
-                grid_width, grid_height = self.calculate_grid_size(self.images, rows, columns)
-                sprite_sheet_width = grid_width
-                sprite_sheet_height = grid_height
-
-                # append this info to the console.
                 self.console.append_text(
                     "INFO: Generated Sprite Sheet Scale = {}x{}".format(sprite_sheet_width, sprite_sheet_height))
 
@@ -273,119 +438,151 @@ class SpriteSheetWidget(QWidget):
             # Connect the clicked signal of the label to the slot function
             self.label.mousePressEvent = lambda event, value=self.label.text(): self.handle_label_click(event, value)
 
-            # Create the QPixmap for the sprite sheet layer.
-            sprite_sheet = QPixmap(sprite_sheet_width, sprite_sheet_height)
-            sprite_sheet.fill(Qt.transparent)
-
-            # Create a separate QPixmap for the outline layer.
-            grid_outline_layer = QPixmap(sprite_sheet_width, sprite_sheet_height)
-            grid_outline_layer.fill(Qt.transparent)
-
-            # Create an Outline around images on the sprite sheet.
-            grid_painter = QPainter(grid_outline_layer)
-            # Set the pen color to cyan for the outline and define the line thickness.
-            grid_painter.setPen(QPen(Qt.cyan, 5))
-
-            sprite_painter = QPainter(sprite_sheet)
-
-            # Create a separate QPixmap for the label layer.
-            label_layer = QPixmap(sprite_sheet_width, sprite_sheet_height)
-            label_layer.fill(Qt.transparent)
-
-            # Create a QPainter for the label layer.
-            label_painter = QPainter(label_layer)
-            # Set the font and color for the labels.
-            label_font = label_painter.font()
-            # Adjust the font size as needed
-            label_font.setPointSize(28)
-            label_painter.setFont(label_font)
-            # Set the label text color
-            label_painter.setPen(QPen(Qt.green))
-            
-            x = 0
-            y = 0
-
-            index = self.control.get_start_frame_value()
-
-            for image in self.images:
-                scaled_image = image.scaled(target_width, target_height, Qt.AspectRatioMode.KeepAspectRatio)
-                
-                index += 1
-                # image_name = str(self.image_sequence[index])
-                # print(image_name)
-                # self.console.append_text(str(image_name))
-
-                # Calculate the offset to center the images within each cell.
-                offset_x = (target_width - scaled_image.width()) // 2
-                offset_y = (target_height - scaled_image.height()) // 2
-
-                # Calculate the center coordinates for the current cell.
-                cell_center_x = x + offset_x
-                cell_center_y = y + offset_y
-
-                # Draw the outline on the outline layer
-                if self.grid_overlay:
-                    grid_painter.drawRect(x, y, target_width, target_height)
-                
-                # Draw the label on the label layer.
-                if self.index_overlay:
-                    label_text = "{}".format(index)
-                    label_painter.drawText(x, y + 60, label_text)
-
-                # Draw the scaled image on the sprite sheet at the center of the cell.
-                sprite_painter.drawPixmap(cell_center_x, cell_center_y, scaled_image)
-
-                x += target_width
-                if x >= sprite_sheet_width:
-                    x = 0
-                    y += target_height
-
-            # Stop painting.
-            grid_painter.end()
-            sprite_painter.end()
-            label_painter.end()
-
-            # Combine the sprite sheet and the outline layer (required to see the outline)
-            sprite_sheet_with_outline = QPixmap(sprite_sheet_width, sprite_sheet_height)
-            sprite_sheet_with_outline.fill(Qt.transparent)
-            sprite_sheet_with_outline_painter = QPainter(sprite_sheet_with_outline)
-            sprite_sheet_with_outline_painter.drawPixmap(0, 0, sprite_sheet)
-            sprite_sheet_with_outline_painter.drawPixmap(0, 0, grid_outline_layer)
-            sprite_sheet_with_outline_painter.drawPixmap(0, 0, label_layer)
-            sprite_sheet_with_outline_painter.end()
+            image_paths = self.image_paths
+            cell_keys = [self.get_cell_key(file_path, target_width, target_height) for file_path in image_paths]
 
             # TODO: Add Masking sequence layer option.
 
-            # return sprite_sheet
-            return sprite_sheet_with_outline
+            if self.compositor.needs_allocation(sprite_sheet_width, sprite_sheet_height):
+                self.release_sprite_sheet()
+
+            self.dirty_rects = self.compositor.compose(
+                cell_keys,
+                lambda index: self.get_scaled_cell(image_paths[index], target_width, target_height),
+                sprite_sheet_width, sprite_sheet_height, rows, columns)
+
+            self.overlay_layout = (min(len(cell_keys), rows * columns), columns, target_width, target_height)
+            self.overlay_first_index = self.control.get_start_frame_value()
+            self.update_overlays()
+
+            return self.compositor.sheet
 
         except Exception as err:
             self.console.append_text("ERROR: create_sprite_sheet: {}".format(err.args))
 
+    def release_sprite_sheet(self) -> None:
+        """
+        Drops the references to the sheet buffer held by this widget, its sheet item and the playback widget,
+        so the buffer is freed before the compositor allocates a sheet of a new size.
+        """
+        self.sprite_sheet = None
+        self.sheet_item.set_image(QImage(), [])
+        self.sheetReady.emit(QImage(), [], self.overlay_first_index)
+
+    def update_overlays(self) -> None:
+        """
+        Shows or hides the grid and index overlays, rebuilding their paths only when the sheet layout changed.
+        """
+        try:
+            if self.overlay_layout:
+                if self.grid_overlay and self.grid_item_layout != self.overlay_layout:
+                    self.grid_item.setPath(self.compositor.grid_path(*self.overlay_layout))
+                    self.grid_item_layout = self.overlay_layout
+
+                index_layout = self.overlay_layout + (self.overlay_first_index,)
+                if self.index_overlay and self.index_item_layout != index_layout:
+                    self.index_item.setPath(self.compositor.index_path(*index_layout))
+                    self.index_item_layout = index_layout
+
+            self.grid_item.setVisible(self.grid_overlay)
+            self.index_item.setVisible(self.index_overlay)
+
+        except Exception as err:
+            self.console.append_text("ERROR: update_overlays: {}".format(err.args))
+
+    def get_cell_key(self, file_path: str, target_width: int, target_height: int) -> tuple:
+        """
+        Gets the key identifying a frame scaled to the cell size.
+
+        Args:
+            file_path: str: the path of the frame.
+            target_width: int: the width of the cell.
+            target_height: int: the height of the cell.
+
+        Returns:
+            tuple: the cell key.
+        """
+        return self.frame_store.get_file_key(file_path), target_width, target_height, self.transform_mode
+
+    def get_scaled_cell(self, file_path: str, target_width: int, target_height: int):
+        """
+        Gets the frame scaled to fit the cell, scaling it only if it is not in the cell cache yet.
+
+        Args:
+            file_path: str: the path of the frame.
+            target_width: int: the width of the cell.
+            target_height: int: the height of the cell.
+
+        Returns:
+            QImage: the scaled frame.
+        """
+        key = self.get_cell_key(file_path, target_width, target_height)
+        scaled_image = self.cell_cache.get(key)
+        if scaled_image is None:
+            image = self.frame_store.get_image(file_path)
+            scaled_image = image.scaled(target_width, target_height, Qt.AspectRatioMode.KeepAspectRatio,
+                                        self.transform_mode)
+            # Store the cell in the pixel format of the sheet, so it can be copied without a conversion.
+            scaled_image = scaled_image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+            if not scaled_image.isNull():
+                self.cell_cache.put(key, scaled_image, scaled_image.sizeInBytes())
+        return scaled_image
+
     def display_sprite_sheet(self) -> None:
         """
         Displays the sprite sheet in the QGraphicsView.
         """
         try:
-            self.scene.clear()
-            self.scene.addPixmap(self.sprite_sheet)
+            self.sheet_item.set_image(self.sprite_sheet, self.dirty_rects)
+            self.scene.setSceneRect(self.sheet_item.boundingRect())
             self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
 
         except Exception as err:
             self.console.append_text("ERROR: display_sprite_sheet: {}".format(err.args))
 
-    def get_generated_sprite_sheet(self):
+    def get_cell_rects(self) -> list:
+        """
+        Gets the area of each used cell on the generated sprite sheet, in frame order.
+
+        Returns:
+            list: the QRect of each cell.
+        """
+        cell_count, columns, cell_width, cell_height = self.overlay_layout
+        return [self.compositor.cell_rect(index, columns, cell_width, cell_height) for index in range(cell_count)]
+
+    def get_generated_sprite_sheet(self, bake_overlays: bool = False):
         """
         Gets the generated sprite sheet image.
+
+        The image shares its pixels with the sheet buffer, it is only copied if overlays are baked into it.
+
+        Args:
+            bake_overlays: bool: paint the enabled grid and index overlays into the image.
+
+        Returns:
+            QImage: the sprite sheet image.
         """
         try:
-            if self.images:
-                pixmap = QPixmap(self.sprite_sheet)
-                return pixmap
+            if self.image_paths:
+                image = self.sprite_sheet
+                if bake_overlays and self.overlay_layout:
+                    first_index = self.overlay_first_index if self.index_overlay else None
+                    image = self.compositor.bake_overlays(*self.overlay_layout, self.grid_overlay, first_index)
+                return image
 
         except Exception as err:
             self.console.append_text("ERROR: display_sprite_sheet: {}".format(err.args))
 
+    def shutdown(self) -> None:
+        """
+        Stops the sheet builds and waits for the worker threads to stop, without scaling the queued cells.
+        """
+        self.rebuild_scheduler.cancel()
+        # The cells of a stale build are skipped, so the build thread only waits for the cells being scaled.
+        self.build_id += 1
+        self.scale_pool.shutdown(wait=True, cancel_futures=True)
+        self.build_pool.shutdown(wait=True, cancel_futures=True)
+
     def wheelEvent(self, event) -> None:
         """
         Handles the wheel event for zooming the sprite sheet.
@@ -447,7 +644,8 @@ class SpriteSheetWidget(QWidget):
         Fits the sprite sheet image to the widget size.
         """
         try:
-            self.view.fitInView(self.scene.itemsBoundingRect(), Qt.KeepAspectRatio)
+            # Fit the sheet itself, hidden overlays of an earlier and larger layout still count as scene items.
+            self.view.fitInView(self.sheet_item.sceneBoundingRect(), Qt.KeepAspectRatio)
 
         except Exception as err:
             self.console.append_text("ERROR: fit_to_widget: {}".format(err.args))
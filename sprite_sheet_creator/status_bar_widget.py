@@ -1,4 +1,5 @@
-from PyQt5.QtWidgets import QLabel, QStatusBar, QProgressBar
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QLabel, QStatusBar, QProgressBar, QPushButton
 
 import style_sheet
 
@@ -6,6 +7,9 @@ import style_sheet
 class StatusBar(QStatusBar):
     """A custom status bar widget with memory usage, total frames, and status information."""
 
+    # The id of the job to cancel, the newest running job shown in the status text and progress bar.
+    cancelClicked = pyqtSignal(int)
+
     def __init__(self):
         """Initialize the StatusBar object.
 
@@ -37,6 +41,16 @@ class StatusBar(QStatusBar):
         self.progress_bar.setStyleSheet(style_sheet.progress_bar_style())
         self.addWidget(self.progress_bar)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip("Cancel the job shown in the status bar.")
+        self.cancel_button.setStyleSheet(style_sheet.stop_btn_style())
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel_job)
+        self.addWidget(self.cancel_button)
+
+        # The names of the running background jobs by id, the progress bar follows the newest one.
+        self.jobs = {}
+
     def progressbar_visibility(self, value: bool) -> None:
         """Toggles the visibility state of the progress bar.
 
@@ -103,3 +117,54 @@ class StatusBar(QStatusBar):
         """
         if value:
             self.label3.setText(r"Status: {}".format(value))
+
+    def job_started(self, job_id: int, name: str) -> None:
+        """Shows a background job that started.
+
+        Args:
+            job_id (int): The id of the job.
+            name (str): The name of the job.
+        """
+        self.jobs[job_id] = name
+        self.show_jobs()
+        self.progress_bar.setMaximum(0)
+
+    def job_progress(self, job_id: int, value: int, maximum: int) -> None:
+        """Shows the progress of a background job, if it is the newest running job.
+
+        Args:
+            job_id (int): The id of the job.
+            value (int): The number of steps done.
+            maximum (int): The number of steps of the job, 0 if it is unknown.
+        """
+        if self.jobs and job_id == max(self.jobs):
+            self.progress_bar.setMaximum(maximum)
+            self.progress_bar.setValue(value)
+
+    def job_ended(self, job_id: int, *args) -> None:
+        """Removes a background job that finished, failed or was cancelled.
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        self.jobs.pop(job_id, None)
+        self.show_jobs()
+
+    def cancel_job(self) -> None:
+        """Asks the newest running job, the one the status text and progress bar show, to stop."""
+        if self.jobs:
+            self.cancelClicked.emit(max(self.jobs))
+
+    def show_jobs(self) -> None:
+        """Updates the status text, progress bar and cancel button for the running jobs."""
+        running = bool(self.jobs)
+        self.progressbar_visibility(running)
+        self.cancel_button.setVisible(running)
+        self.progress_bar.reset()
+
+        if not running:
+            self.set_status_text("Ready")
+        elif len(self.jobs) == 1:
+            self.set_status_text(self.jobs[max(self.jobs)])
+        else:
+            self.set_status_text("{} (+{} more)".format(self.jobs[max(self.jobs)], len(self.jobs) - 1))
@@ -116,7 +116,7 @@ def main_window_style():
 
 def table_widget_style():
     stylesheet = """
-    QTableWidget {
+    QTableView {
         background-color: #484A4F;  /* Set the background color */
         alternate-background-color: Green;  /* Set the alternate row background color */
         selection-background-color: Blue;  /* Set the selection background color */
@@ -126,7 +126,7 @@ def table_widget_style():
         border: %(Border_size_color)s;
         border-radius: %(Border_Radius)s;
     }
-    QTableWidget::item {
+    QTableView::item {
         background-color: #6e6f70;
         border: %(Border_size_color)s;
         border-radius: %(Border_Radius)s;
@@ -143,7 +143,7 @@ def table_widget_style():
         background-color: #4772B3;  /* Set the background color when the section is checked */
         
     }
-    QTableWidget QTableCornerButton::section {
+    QTableView QTableCornerButton::section {
         background-color: #4772B3;  /* Set the corner button background color */
         border: %(Border_size_color)s;
         border-radius: %(Border_Radius)s;
@@ -493,6 +493,15 @@ def image_grid_label_style():
         """ % get_style()
     return style_sheet
 
+def image_grid_list_style():
+    style_sheet = """
+        QListView {
+            background-color: %(Dock_Widget_Background_color)s;
+            border: none;
+        }
+        """ % get_style()
+    return style_sheet + scroll_bar_style()
+
 def folder_path_label_style():
     style_sheet = """
         QLabel {
@@ -514,7 +523,7 @@ def folder_path_label_style():
 
 def console_style():
     style_sheet = """
-        QTextEdit {
+        QPlainTextEdit {
             background-color: %(Unfocused_Console_Background_Color)s; /* Background color */
             color: %(Font_Color)s;
             font-family: %(Font_Family)s;
@@ -523,12 +532,12 @@ def console_style():
             padding: %(padding_size)s;
         }
         
-        QTextEdit:hover {
+        QPlainTextEdit:hover {
             background-color: %(Hover_Console_Background_Color)s;
             border: %(Border_hover_size_color)s;
         }
         
-        QTextEdit:focus {
+        QPlainTextEdit:focus {
             background-color: %(Focused_Console_Background_Color)s; /* Background color */
             color: %(Font_Color)s;
             border: 1px solid #50BBAE; /* Border style when focused */         
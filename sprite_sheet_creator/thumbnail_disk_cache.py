@@ -0,0 +1,162 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtGui import QImage
+
+
+class ThumbnailDiskCache:
+    """
+    Keeps the thumbnails as small PNG files, so reopening a sequence does not create them again.
+
+    A thumbnail is stored under a hash of the source path, modification time, file size and thumbnail height,
+    so a frame that changed on disk gets a new entry. The files live next to, not inside, the temp directory
+    of this tool, which is deleted on exit.
+
+    Once the files use more than the size cap, the least recently used ones are deleted. A file's
+    modification time is refreshed when it is read, so the order survives restarts.
+    """
+
+    def __init__(self, cache_directory: str = None, max_bytes: int = 256 * 1024 ** 2):
+        """
+        Initialize the ThumbnailDiskCache.
+
+        Args:
+            cache_directory (str, optional): The directory of the cached files. Defaults to a folder in the
+                system temp directory.
+            max_bytes (int): The number of bytes the cached files may use. Defaults to 256MB.
+        """
+        self.cache_directory = cache_directory or "{}/{}".format(tempfile.gettempdir(), "SuperSprite_Thumbnails")
+        self.max_bytes = max_bytes
+
+        # The cached file names and sizes, least recently used first. Read from the directory on first use.
+        self.entries = None
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+
+    def get_file_name(self, key: tuple, thumbnail_height: int) -> str:
+        """
+        Gets the name of the cached file for a frame.
+
+        Args:
+            key (tuple): The path, modification time and size of the source file.
+            thumbnail_height (int): The height of the thumbnail in pixels.
+
+        Returns:
+            str: The file name.
+        """
+        digest = hashlib.sha1("{}|{}".format(key, thumbnail_height).encode("utf-8")).hexdigest()
+        return "{}.png".format(digest)
+
+    def load_entries(self) -> None:
+        """
+        Reads the cached files from the directory, the lock must be held by the caller.
+        """
+        if self.entries is not None:
+            return
+
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        os.makedirs(self.cache_directory, exist_ok=True)
+
+        files = []
+        for entry in os.scandir(self.cache_directory):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+
+        for _, file_name, size in sorted(files):
+            self.entries[file_name] = size
+            self.current_bytes += size
+
+    def get(self, key: tuple, thumbnail_height: int):
+        """
+        Reads a cached thumbnail and marks it as the most recently used.
+
+        Args:
+            key (tuple): The path, modification time and size of the source file.
+            thumbnail_height (int): The height of the thumbnail in pixels.
+
+        Returns:
+            QImage: The thumbnail, or None if the frame is not cached.
+        """
+        file_name = self.get_file_name(key, thumbnail_height)
+        with self.lock:
+            self.load_entries()
+            if file_name not in self.entries:
+                return None
+            self.entries.move_to_end(file_name)
+
+        file_path = os.path.join(self.cache_directory, file_name)
+        image = QImage(file_path)
+        if image.isNull():
+            return None
+
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+        return image
+
+    def put(self, key: tuple, thumbnail_height: int, image: QImage) -> None:
+        """
+        Writes a thumbnail to the cache and deletes the least recently used files to stay within the size cap.
+
+        Args:
+            key (tuple): The path, modification time and size of the source file.
+            thumbnail_height (int): The height of the thumbnail in pixels.
+            image (QImage): The thumbnail.
+        """
+        if image is None or image.isNull():
+            return
+
+        file_name = self.get_file_name(key, thumbnail_height)
+        file_path = os.path.join(self.cache_directory, file_name)
+
+        with self.lock:
+            self.load_entries()
+
+        # Write to a temporary name first, so a reader never sees a half written file.
+        temp_path = "{}.{}.tmp".format(file_path, threading.get_ident())
+        if not image.save(temp_path, "PNG"):
+            return
+        try:
+            os.replace(temp_path, file_path)
+            size = os.path.getsize(file_path)
+        except OSError:
+            return
+
+        with self.lock:
+            self.current_bytes -= self.entries.pop(file_name, 0)
+            self.entries[file_name] = size
+            self.current_bytes += size
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Deletes the least recently used files until the cache fits in its size cap.
+        The lock must be held by the caller.
+        """
+        while self.current_bytes > self.max_bytes and self.entries:
+            file_name, size = self.entries.popitem(last=False)
+            self.current_bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_directory, file_name))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Deletes all the cached files.
+        """
+        with self.lock:
+            self.load_entries()
+            for file_name in self.entries:
+                try:
+                    os.remove(os.path.join(self.cache_directory, file_name))
+                except OSError:
+                    pass
+            self.entries.clear()
+            self.current_bytes = 0
@@ -0,0 +1,388 @@
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QObject, QAbstractListModel, QModelIndex, QSize, QRect, pyqtSignal
+from PyQt5.QtGui import QPixmap, QColor, QPen, QFont, QPainter
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+
+import style_sheet
+from frame_cache import FrameCache
+
+
+class ThumbnailLoader(QObject):
+    """
+    Creates the thumbnails of the image sequence on background threads.
+
+    The pending frames are kept in a priority queue. Each worker takes the most urgent frame when it starts,
+    so the visible frames are created first and the rest of the sequence follows outward from them.
+
+    The frames of a video cost a decode from the keyframe before them, so only the video frames within a few
+    rows of the visible ones are queued. The others wait until they are scrolled close to the view.
+
+    The frame store reads the thumbnails from its disk cache when the frame was seen before, otherwise it
+    creates them from the full resolution frames.
+    """
+
+    # The load generation, the file path and the thumbnail QImage.
+    thumbnailReady = pyqtSignal(int, str, object)
+
+    def __init__(self, frame_store, max_workers: int = None, video_margin: int = 16, parent=None):
+        """
+        Initialize the ThumbnailLoader.
+
+        Args:
+            frame_store (FrameStore): The store holding the decoded frames.
+            max_workers (int, optional): The number of worker threads. Defaults to the number of cores.
+            video_margin (int): The number of rows before and after the visible ones whose video frames are
+                queued.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.frame_store = frame_store
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+        self.video_margin = video_margin
+
+        self.generation = 0
+        self.rows = {}
+        # The priority of each frame without a thumbnail, and the video frames among them.
+        self.pending = {}
+        self.video_frames = set()
+        # The queued frames, only the frames that may be created now.
+        self.queue = []
+        # The worker tasks submitted for this generation that did not start yet.
+        self.waiting_tasks = 0
+        # The frames being created, until their thumbnail reached the GUI thread.
+        self.loading = set()
+        self.lock = threading.Lock()
+
+        # Connected before the model, so a frame is no longer loading by the time the model stores it.
+        self.thumbnailReady.connect(self.finish_thumbnail)
+
+    def load(self, image_sequence: list) -> int:
+        """
+        Queues the thumbnails of a new sequence, dropping the frames still queued for the previous one.
+
+        Args:
+            image_sequence (list): A list of image paths for the sequence.
+
+        Returns:
+            int: The generation the thumbnails of this sequence are reported with.
+        """
+        video_frames = {file_path for file_path in image_sequence if self.frame_store.is_video_frame(file_path)}
+
+        with self.lock:
+            self.generation += 1
+            self.rows = {}
+            for row, file_path in enumerate(image_sequence):
+                self.rows.setdefault(file_path, row)
+            self.pending = dict(self.rows)
+            self.video_frames = video_frames
+            self.waiting_tasks = 0
+            self.loading = set()
+            self.queue = [(row, file_path) for file_path, row in self.pending.items() if self.is_ready(file_path, row)]
+            generation = self.generation
+
+        self.submit_tasks()
+        return generation
+
+    def is_ready(self, file_path: str, priority: int) -> bool:
+        """
+        Checks if a pending frame may be created now. The lock must be held by the caller.
+
+        Args:
+            file_path (str): The path of the image file.
+            priority (int): The distance of its row from the visible rows.
+
+        Returns:
+            bool: False for the video frames too far from the visible rows.
+        """
+        return priority <= self.video_margin or file_path not in self.video_frames
+
+    def submit_tasks(self) -> None:
+        """
+        Submits a worker task for every queued frame that has none waiting for it yet.
+        """
+        with self.lock:
+            missing = len(self.queue) - self.waiting_tasks
+            self.waiting_tasks += max(missing, 0)
+            generation = self.generation
+
+        # Each task takes whichever frame is most urgent when it runs, not a fixed frame.
+        for _ in range(missing):
+            self.executor.submit(self.load_next, generation)
+
+    def prioritize(self, first_row: int, last_row: int) -> None:
+        """
+        Moves the visible frames to the front of the queue, followed by their neighbors.
+
+        Args:
+            first_row (int): The first visible row.
+            last_row (int): The last visible row.
+        """
+        with self.lock:
+            for file_path, row in self.rows.items():
+                if file_path in self.pending:
+                    self.pending[file_path] = max(first_row - row, row - last_row, 0)
+            self.queue = [(priority, file_path) for file_path, priority in self.pending.items()
+                          if self.is_ready(file_path, priority)]
+            heapq.heapify(self.queue)
+
+        self.submit_tasks()
+
+    def request(self, file_path: str) -> None:
+        """
+        Queues a single thumbnail ahead of everything else, for example after its pixmap was evicted.
+
+        A frame that was already requested or is being created is not queued again, so the repaints of a row
+        waiting for its thumbnail cost nothing.
+
+        Args:
+            file_path (str): The path of the image file.
+        """
+        with self.lock:
+            if file_path not in self.rows or file_path in self.loading or self.pending.get(file_path) == -1:
+                return
+            self.pending[file_path] = -1
+            heapq.heappush(self.queue, (-1, file_path))
+
+        self.submit_tasks()
+
+    def load_next(self, generation: int) -> None:
+        """
+        Creates the most urgent pending thumbnail. Runs on a worker thread.
+
+        Args:
+            generation (int): The load this task was queued for.
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.waiting_tasks -= 1
+            file_path = None
+            while self.queue:
+                priority, candidate = heapq.heappop(self.queue)
+                # Entries whose priority changed since they were queued are outdated duplicates.
+                if self.pending.get(candidate) == priority:
+                    del self.pending[candidate]
+                    self.loading.add(candidate)
+                    file_path = candidate
+                    break
+
+        if file_path is not None:
+            self.thumbnailReady.emit(generation, file_path, self.frame_store.get_thumbnail(file_path))
+
+    def finish_thumbnail(self, generation: int, file_path: str, thumbnail) -> None:
+        """
+        Marks a frame as created once its thumbnail reached the GUI thread, so it can be requested again if its
+        pixmap is evicted later.
+
+        Args:
+            generation (int): The load the thumbnail was created for.
+            file_path (str): The path of the image file.
+            thumbnail (QImage): The thumbnail image.
+        """
+        with self.lock:
+            if generation == self.generation:
+                self.loading.discard(file_path)
+
+    def shutdown(self) -> None:
+        """
+        Drops the queued thumbnails and waits for the worker threads to stop.
+
+        The queued tasks are cancelled instead of run, so only the thumbnails being created right now delay the exit.
+        """
+        with self.lock:
+            self.generation += 1
+            self.rows = {}
+            self.pending = {}
+            self.video_frames = set()
+            self.queue = []
+            self.waiting_tasks = 0
+            self.loading = set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    A list model with one row per frame of the image sequence.
+
+    The model only holds the paths. The thumbnails are created by a ThumbnailLoader, until a thumbnail arrives
+    its row has no decoration and the delegate paints a placeholder. The pixmaps of the thumbnails are kept in
+    a small least recently used cache.
+    """
+
+    FilePathRole = Qt.UserRole + 1
+
+    def __init__(self, frame_store, parent=None):
+        """
+        Initialize the ThumbnailModel.
+
+        Args:
+            frame_store (FrameStore): The store holding the decoded frames.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.frame_store = frame_store
+        self.image_sequence = []
+        self.rows = {}
+        self.pixmap_cache = FrameCache(64 * 1024 ** 2)
+
+        self.loader = ThumbnailLoader(frame_store, parent=self)
+        self.loader.thumbnailReady.connect(self.set_thumbnail)
+        self.generation = 0
+
+    def set_sequence(self, image_sequence: list) -> None:
+        """
+        Replaces the frames shown by the model.
+
+        Args:
+            image_sequence (list): A list of image paths for the sequence.
+        """
+        self.beginResetModel()
+        self.image_sequence = list(image_sequence)
+        self.rows = {}
+        for row, file_path in enumerate(self.image_sequence):
+            self.rows.setdefault(file_path, []).append(row)
+        self.pixmap_cache.clear()
+        self.generation = self.loader.load(self.image_sequence)
+        self.endResetModel()
+
+    def set_thumbnail(self, generation: int, file_path: str, thumbnail) -> None:
+        """
+        Stores a thumbnail created by the loader and repaints its rows.
+
+        Args:
+            generation (int): The load the thumbnail was created for.
+            file_path (str): The path of the image file.
+            thumbnail (QImage): The thumbnail image.
+        """
+        if generation != self.generation or file_path not in self.rows:
+            return
+
+        pixmap = QPixmap.fromImage(thumbnail)
+        self.pixmap_cache.put(file_path, pixmap, pixmap.width() * pixmap.height() * 4)
+        for row in self.rows[file_path]:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.image_sequence)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.image_sequence):
+            return None
+
+        file_path = self.image_sequence[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(file_path)
+        if role == Qt.DecorationRole:
+            return self.get_pixmap(file_path)
+        if role == Qt.ToolTipRole or role == self.FilePathRole:
+            return file_path
+        return None
+
+    def get_pixmap(self, file_path: str):
+        """
+        Gets the thumbnail of a frame as a pixmap, without waiting for it to be created.
+
+        Args:
+            file_path (str): The path of the image file.
+
+        Returns:
+            QPixmap: The thumbnail pixmap, or None while the thumbnail is being created.
+        """
+        pixmap = self.pixmap_cache.get(file_path)
+        if pixmap is None:
+            # The pixmap cache is the only copy of the thumbnail, an evicted one is created again ahead of the queue.
+            self.loader.request(file_path)
+        return pixmap
+
+    def prioritize(self, first_row: int, last_row: int) -> None:
+        """
+        Creates the thumbnails of the visible rows first.
+
+        Args:
+            first_row (int): The first visible row.
+            last_row (int): The last visible row.
+        """
+        self.loader.prioritize(first_row, last_row)
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """
+    Paints a thumbnail with its file name below it, the way the thumbnail labels of the strip looked.
+
+    Every item has the same size, so the view can lay out any number of frames without measuring them.
+    """
+
+    def __init__(self, thumbnail_height: int = 150, parent=None):
+        """
+        Initialize the ThumbnailDelegate.
+
+        Args:
+            thumbnail_height (int): The height of the thumbnails in pixels.
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        style = style_sheet.get_style()
+
+        self.thumbnail_height = thumbnail_height
+        self.label_height = 30
+        self.margin = 6
+        self.item_size = QSize(thumbnail_height * 4 // 3 + self.margin * 2,
+                               thumbnail_height + self.label_height + self.margin * 3)
+
+        self.label_color = QColor(style["Non_Selected_Color"])
+        self.hover_color = QColor("#6b7c80")
+        self.placeholder_color = QColor(style["Viewer_Background_color"])
+        self.font_color = QColor(style["Font_Color"])
+        self.border_pen = QPen(QColor("black"), 1)
+        self.hover_pen = QPen(QColor("gold"), 1)
+
+        self.label_font = QFont()
+        self.label_font.setPixelSize(14)
+
+    def sizeHint(self, option, index) -> QSize:
+        return self.item_size
+
+    def paint(self, painter, option, index) -> None:
+        rect = option.rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        image_rect = QRect(rect.x(), rect.y(), rect.width(), self.thumbnail_height)
+        if hovered:
+            painter.setPen(self.hover_pen)
+            painter.setBrush(self.hover_color)
+            painter.drawRoundedRect(image_rect, 5, 5)
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is None:
+            # The thumbnail is still being created.
+            painter.setPen(self.border_pen)
+            painter.setBrush(self.placeholder_color)
+            painter.drawRoundedRect(image_rect, 5, 5)
+        elif not pixmap.isNull():
+            # Fit the thumbnail inside the image area and center it.
+            size = pixmap.size().scaled(image_rect.size(), Qt.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(image_rect.center())
+            painter.drawPixmap(target, pixmap)
+
+        label_rect = QRect(rect.x(), image_rect.bottom() + self.margin, rect.width(), self.label_height)
+        painter.setPen(self.hover_pen if hovered else self.border_pen)
+        painter.setBrush(self.hover_color if hovered else self.label_color)
+        painter.drawRoundedRect(label_rect, 5, 5)
+
+        painter.setFont(self.label_font)
+        painter.setPen(self.font_color)
+        text = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideMiddle, label_rect.width() - 8)
+        painter.drawText(label_rect, Qt.AlignCenter, text)
+
+        painter.restore()
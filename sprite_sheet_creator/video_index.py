@@ -0,0 +1,172 @@
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+
+import cv2
+
+
+class VideoIndex:
+    """
+    The keyframes and timestamps of the frames of a video.
+
+    A frame can only be decoded starting from the keyframe before it, so with the keyframes known, a frame is
+    reached by seeking to its keyframe and decoding at most one group of pictures, instead of decoding on from
+    wherever the decoder happens to be.
+    """
+
+    def __init__(self, keyframes: list, timestamps: list):
+        """
+        Initialize the VideoIndex.
+
+        Args:
+            keyframes (list): The indexes of the keyframes, in ascending order.
+            timestamps (list): The presentation time of each frame in milliseconds.
+        """
+        self.keyframes = keyframes
+        self.timestamps = timestamps
+        self.frame_count = len(timestamps)
+
+    @classmethod
+    def build(cls, video_path: str, progress_callback=None, is_cancelled=None):
+        """
+        Reads the keyframe flags and timestamps of all the frames of a video.
+
+        The packets are read from the container without decoding them, which is much faster than a decode.
+
+        Args:
+            video_path (str): The path of the video file.
+            progress_callback (callable, optional): Called with the number of frames read so far.
+            is_cancelled (callable, optional): Returns True to stop reading.
+
+        Returns:
+            VideoIndex: The index, or None if the video could not be read or reading was cancelled.
+        """
+        # A negative format makes the FFmpeg backend return the raw packets instead of decoded frames.
+        capture = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        if not capture.isOpened():
+            return None
+
+        keyframes = []
+        timestamps = []
+        try:
+            while capture.grab():
+                if capture.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframes.append(len(timestamps))
+                timestamps.append(capture.get(cv2.CAP_PROP_POS_MSEC))
+
+                if len(timestamps) % 500 == 0:
+                    if is_cancelled and is_cancelled():
+                        return None
+                    if progress_callback:
+                        progress_callback(len(timestamps))
+        finally:
+            capture.release()
+
+        # Without keyframe flags from the backend the index can not tell where decoding may start.
+        if not timestamps or not keyframes or keyframes[0] != 0:
+            return None
+        return cls(keyframes, timestamps)
+
+    def get_keyframe(self, index: int) -> int:
+        """
+        Gets the keyframe decoding a frame has to start from.
+
+        Args:
+            index (int): The index of the frame.
+
+        Returns:
+            int: The index of the last keyframe at or before the frame.
+        """
+        return self.keyframes[max(bisect.bisect_right(self.keyframes, index) - 1, 0)]
+
+    def to_dict(self) -> dict:
+        """
+        Gets the index as a dictionary that can be written as JSON.
+
+        Returns:
+            dict: The keyframes and timestamps.
+        """
+        return {"keyframes": self.keyframes, "timestamps": self.timestamps}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Creates an index from a dictionary written by to_dict.
+
+        Args:
+            data (dict): The keyframes and timestamps.
+
+        Returns:
+            VideoIndex: The index.
+        """
+        return cls(list(data["keyframes"]), list(data["timestamps"]))
+
+
+class VideoIndexCache:
+    """
+    Keeps the index of each video as a small JSON file, so a video is only indexed the first time it is opened.
+
+    An index is stored under a hash of the video path, modification time and file size, so a video that
+    changed on disk is indexed again. The files live next to, not inside, the temp directory of this tool,
+    which is deleted on exit.
+    """
+
+    def __init__(self, cache_directory: str = None):
+        """
+        Initialize the VideoIndexCache.
+
+        Args:
+            cache_directory (str, optional): The directory of the cached files. Defaults to a folder in the
+                system temp directory.
+        """
+        self.cache_directory = cache_directory or "{}/{}".format(tempfile.gettempdir(), "SuperSprite_VideoIndex")
+
+    def get_file_path(self, video_path: str) -> str:
+        """
+        Gets the path of the cached index of a video.
+
+        Args:
+            video_path (str): The path of the video file.
+
+        Returns:
+            str: The path of the JSON file.
+        """
+        stat = os.stat(video_path)
+        key = (video_path, stat.st_mtime_ns, stat.st_size)
+        digest = hashlib.sha1("{}".format(key).encode("utf-8")).hexdigest()
+        return "{}/{}.json".format(self.cache_directory, digest)
+
+    def get_index(self, video_path: str, progress_callback=None, is_cancelled=None):
+        """
+        Reads the cached index of a video, or builds and caches it on first open.
+
+        Args:
+            video_path (str): The path of the video file.
+            progress_callback (callable, optional): Called with the number of frames indexed so far.
+            is_cancelled (callable, optional): Returns True to stop indexing.
+
+        Returns:
+            VideoIndex: The index, or None if the video can not be indexed.
+        """
+        file_path = self.get_file_path(video_path)
+        try:
+            with open(file_path, "r", encoding="utf-8") as index_file:
+                return VideoIndex.from_dict(json.load(index_file))
+        except (OSError, ValueError, KeyError):
+            pass
+
+        video_index = VideoIndex.build(video_path, progress_callback, is_cancelled)
+        if video_index is not None:
+            try:
+                os.makedirs(self.cache_directory, exist_ok=True)
+                # Write to a temporary file first, so a reader never sees a partly written index.
+                temp_path = "{}.{}.tmp".format(file_path, os.getpid())
+                with open(temp_path, "w", encoding="utf-8") as index_file:
+                    json.dump(video_index.to_dict(), index_file)
+                os.replace(temp_path, file_path)
+            except OSError:
+                # The index still works for this session without the cached file.
+                pass
+        return video_index
@@ -0,0 +1,236 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import cv2
+from PyQt5.QtCore import Qt, QFileInfo
+from PyQt5.QtGui import QImage
+
+
+class VideoSource:
+    """
+    Decodes the frames of a video file on demand, straight from the container.
+
+    Each frame is addressed by a frame path made of the video path and the frame index, for example
+    "clip.mp4#frame000012", so the rest of the tool handles the frames of a video like image files.
+
+    OpenCV decodes the frames in order, so reading the next frames only continues the decode. A frame further
+    ahead is reached by skipping the frames before it without converting them, and only a frame behind the
+    decoder or far ahead of it needs a seek. The last few decoded frames are kept, so threads asking for
+    neighbouring frames slightly out of order do not seek back.
+
+    With a keyframe index, a seek lands on the keyframe before the frame and decoding on from the current
+    position is only used while no keyframe lies in between, so any frame costs at most one group of pictures.
+    """
+
+    frame_pattern = re.compile(r"^(?P<video_path>.+)#frame(?P<index>\d+)$")
+
+    def __init__(self, video_path: str, video_index=None, recent_frames: int = 8, max_skip: int = 64):
+        """
+        Initialize the VideoSource.
+
+        Args:
+            video_path (str): The path of the video file.
+            video_index (VideoIndex, optional): The keyframes and timestamps of the video.
+            recent_frames (int): The number of decoded frames kept for out of order reads.
+            max_skip (int): Without a keyframe index, the number of frames decoded forward to reach a frame
+                instead of seeking to it.
+
+        Raises:
+            IOError: If the video can not be opened.
+        """
+        self.video_path = video_path
+        self.capture = cv2.VideoCapture(video_path)
+        if not self.capture.isOpened():
+            raise IOError("Could not open video: {}".format(video_path))
+
+        # The index counts the frames in the container, the header count is only an estimate for some files.
+        self.video_index = video_index
+        if video_index is not None:
+            self.frame_count = video_index.frame_count
+        else:
+            self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        self.recent_frames = recent_frames
+        self.max_skip = max_skip
+
+        # The index of the frame the decoder reads next, and the last decoded frames by index.
+        self.position = 0
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_frame_path(video_path: str, index: int) -> str:
+        """
+        Gets the path addressing a frame of a video.
+
+        Args:
+            video_path (str): The path of the video file.
+            index (int): The index of the frame.
+
+        Returns:
+            str: The frame path.
+        """
+        return "{}#frame{:06d}".format(video_path, index)
+
+    @classmethod
+    def split_frame_path(cls, file_path: str) -> tuple:
+        """
+        Splits a frame path into the video path and the frame index.
+
+        Args:
+            file_path (str): The frame path.
+
+        Returns:
+            tuple: The video path and the frame index, or None and None if it is not a frame path.
+        """
+        match = cls.frame_pattern.match(file_path)
+        if match is None:
+            return None, None
+        return match.group("video_path"), int(match.group("index"))
+
+    @classmethod
+    def get_export_file_name(cls, file_path: str) -> str:
+        """
+        Gets the file name a frame is written to when the sequence is exported.
+
+        Args:
+            file_path (str): The frame path.
+
+        Returns:
+            str: The PNG file name, made of the video name and the frame index.
+        """
+        video_path, index = cls.split_frame_path(file_path)
+        return "{}_{:06d}.png".format(os.path.splitext(os.path.basename(video_path))[0], index)
+
+    def get_frame_paths(self) -> list:
+        """
+        Gets the paths of all the frames of the video.
+
+        Returns:
+            list: The frame paths in playback order.
+        """
+        return [self.get_frame_path(self.video_path, index) for index in range(self.frame_count)]
+
+    def read_frame(self, index: int) -> QImage:
+        """
+        Decodes a frame of the video.
+
+        Args:
+            index (int): The index of the frame.
+
+        Returns:
+            QImage: The frame, a null image if it could not be decoded.
+        """
+        with self.lock:
+            image = self.recent.get(index)
+            if image is not None:
+                return image
+
+            if self.needs_seek(index):
+                self.seek(index)
+
+            image = QImage()
+            while self.position <= index:
+                # Only the frames close to the requested one are converted, the frames before them are skipped.
+                if index - self.position >= self.recent_frames:
+                    read = self.capture.grab()
+                else:
+                    read, frame = self.capture.read()
+                    if read:
+                        image = self.to_image(frame)
+                        self.remember(self.position, image)
+                if not read:
+                    break
+                self.position += 1
+            return image
+
+    def needs_seek(self, index: int) -> bool:
+        """
+        Checks if reaching a frame is faster with a seek than by decoding on from the current position.
+
+        Args:
+            index (int): The index of the frame.
+
+        Returns:
+            bool: True if the decoder should seek.
+        """
+        if index < self.position:
+            return True
+        if self.video_index is None:
+            return index - self.position > self.max_skip
+        # Decoding on is never longer than a seek while there is no keyframe after the current position.
+        return self.video_index.get_keyframe(index) > self.position
+
+    def seek(self, index: int) -> None:
+        """
+        Moves the decoder to a frame, or to the keyframe before it when the keyframes are known.
+        The lock must be held by the caller.
+
+        Args:
+            index (int): The index of the frame to read.
+        """
+        if self.video_index is not None:
+            index = self.video_index.get_keyframe(index)
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self.position = index
+
+    def remember(self, index: int, image: QImage) -> None:
+        """
+        Keeps a decoded frame for out of order reads, dropping the oldest one. The lock must be held by the caller.
+
+        Args:
+            index (int): The index of the frame.
+            image (QImage): The decoded frame.
+        """
+        self.recent[index] = image
+        while len(self.recent) > self.recent_frames:
+            self.recent.popitem(last=False)
+
+    def to_image(self, frame) -> QImage:
+        """
+        Converts a decoded OpenCV frame to a QImage that owns its pixels.
+
+        Args:
+            frame (np.ndarray): The (height, width, 3) BGR frame.
+
+        Returns:
+            QImage: The frame in the 32-bit format Qt paints fastest.
+        """
+        height, width = frame.shape[:2]
+        image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_BGR888)
+        return image.convertToFormat(QImage.Format_RGB32)
+
+    def get_metadata(self, file_path: str) -> dict:
+        """
+        Gets the metadata of a frame from the video, without decoding it.
+
+        Args:
+            file_path (str): The frame path.
+
+        Returns:
+            dict: The creation time, name, path, size, width, height and bit depth of the frame.
+                The frames are not files, so their size is 0.
+        """
+        file_info = QFileInfo(self.video_path)
+        return {
+            "creation_time": file_info.created().toString(Qt.ISODate),
+            "file_name": os.path.basename(file_path),
+            "file_path": file_path,
+            "file_size": 0,
+            "width": self.width,
+            "height": self.height,
+            "depth": 24,
+        }
+
+    def close(self) -> None:
+        """
+        Releases the video file.
+        """
+        with self.lock:
+            self.capture.release()
+            self.recent.clear()